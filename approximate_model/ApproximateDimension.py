@@ -10,22 +10,51 @@ passed during initialization.
 """
 import copy
 
-from constants.flow_constants import FLOW, TIME, APPROXIMATE_TYPE, NUMBER_OF_INTERVALS
+import numpy as np
+
+from constants.flow_constants import FLOW, TIME, APPROXIMATE_TYPE, NUMBER_OF_INTERVALS, RUN_LENGTH
 from common_utils.approximate_model.approximate_type import ApproximateType
+from common_utils.approximate_model.run_length_flow import RunLengthFlow
 from common_utils.approximate_model.spectrum_approximation import \
     SpectrumWithMoreRealizationApproximate
 from common_utils.approximate_model.StochasticTelegraphWaveFixedSeparatedIntervalApproximate import \
     StochasticTelegraphWaveFixedSeparatedIntervalApproximate
+from maths.moments import Moments
 
 
 class ApproximateDimension:
 
-    def __init__(self, dim,  approximate_config: dict = None):
+    def __init__(self, dim,  approximate_config: dict = None, moments: Moments = None):
+        """
+        :param dim: dimension flow.
+        :param approximate_config: configuration of the approximation.
+        :param moments: moments of dim[FLOW] if they are already calculated.
+        """
         self.dim = dim
-        self.dim_flow_mean = dim[FLOW].mean()
-        self.dim_flow_std = dim[FLOW].std()
+        self.flow_moments = moments or Moments.from_values(dim[FLOW])
+        self.dim_flow_mean = self.flow_moments.mean
+        self.dim_flow_std = self.flow_moments.std
         approximate_type =  ApproximateType[approximate_config.get(APPROXIMATE_TYPE)]
         number_of_interval = approximate_config.get(NUMBER_OF_INTERVALS)
+        self.run_length_flow = None
+        self.approximate_moments = None
+        if approximate_config.get(RUN_LENGTH, False) and approximate_type in (
+                ApproximateType.STOCHASTIC_TELEGRAPH_WAVE,
+                ApproximateType.STOCHASTIC_TELEGRAPH_WAVE_FIXED_SEPARATED_INTERVAL):
+            if approximate_type == ApproximateType.STOCHASTIC_TELEGRAPH_WAVE:
+                self.run_length_flow = self.approximate_stochastic_telegraph_wave_run_length()
+            else:
+                self.run_length_flow = StochasticTelegraphWaveFixedSeparatedIntervalApproximate(
+                    dim, number_of_interval).get_run_length_param(self.flow_moments)
+            self.approximate_dim = None
+            self.error_approximate_dim = None
+            self.approximate_moments = self.run_length_flow.get_approximate_moments()
+            self.approximate_dim_mean = self.approximate_moments.mean
+            self.approximate_dim_std = self.approximate_moments.std
+            error_moments = self.run_length_flow.get_error_moments()
+            self.error_approximate_dim_mean, self.error_approximate_dim_std = error_moments.mean, error_moments.std
+            self.tau_sequence = self.run_length_flow.get_tau_sequence()
+            return
         if approximate_type == ApproximateType.STOCHASTIC_TELEGRAPH_WAVE:
             self.approximate_dim, self.approximate_dim_mean, self.approximate_dim_std\
                 = self.approximate_stochastic_telegraph_wave()
@@ -33,14 +62,12 @@ class ApproximateDimension:
             self.approximate_dim, self.approximate_dim_mean, self.approximate_dim_std\
                 = StochasticTelegraphWaveFixedSeparatedIntervalApproximate(dim, number_of_interval).get_param()
         elif approximate_type == ApproximateType.SPECTRUM_WITH_MORE_REALIZATION:
-            self.approximate_dim, self.approximate_dim_mean, self.approximate_dim_std \
-                = SpectrumWithMoreRealizationApproximate(dim, approximate_config).get_param()
-            self.mean_approximate_dim \
-                = SpectrumWithMoreRealizationApproximate(dim, approximate_config).get_mean_approximate_dim()
-            self.transposed_matrix_cos, self.transposed_matrix_sin  \
-                = SpectrumWithMoreRealizationApproximate(dim, approximate_config).get_transposed_matrix()
-            self.cos_harmonic_values, self.sin_harmonic_values \
-                = SpectrumWithMoreRealizationApproximate(dim, approximate_config).get_cos_and_sin_harmonic_values()
+            spectrum = SpectrumWithMoreRealizationApproximate(dim, approximate_config)
+            self.approximate_dim, self.approximate_dim_mean, self.approximate_dim_std = spectrum.get_param()
+            self.mean_approximate_dim = spectrum.get_mean_approximate_dim()
+            self.transposed_matrix_cos, self.transposed_matrix_sin = spectrum.get_transposed_matrix()
+            self.cos_harmonic_values, self.sin_harmonic_values = spectrum.get_cos_and_sin_harmonic_values()
+            self.harmonic_counts = spectrum.get_harmonic_counts()
         elif approximate_type == ApproximateType.NONE:
             self.approximate_dim, self.approximate_dim_mean, self.approximate_dim_std= self.approximate_none()
 
@@ -53,20 +80,30 @@ class ApproximateDimension:
         Approximates the dimension flow by rule stochastic telegraph wave.
         :return: dimensionless flow
         """
-        approximate_dim = copy.copy(self.dim)
-        for i in range(len(self.dim[FLOW])):
-            if self.dim[FLOW][i] > self.dim_flow_mean:
-                approximate_dim[FLOW][i] = self.dim_flow_mean + self.dim_flow_std
-            else:
-                approximate_dim[FLOW][i] = self.dim_flow_mean - self.dim_flow_std
-        return approximate_dim, approximate_dim[FLOW].mean(), approximate_dim[FLOW].std()
+        approximate_dim = self.dim.assign(**{FLOW: np.where(self.dim[FLOW].to_numpy() > self.dim_flow_mean,
+                                                            self.dim_flow_mean + self.dim_flow_std,
+                                                            self.dim_flow_mean - self.dim_flow_std)})
+        self.approximate_moments = Moments.from_values(approximate_dim[FLOW])
+        return approximate_dim, self.approximate_moments.mean, self.approximate_moments.std
+
+    def approximate_stochastic_telegraph_wave_run_length(self) -> RunLengthFlow:
+        """
+        Approximates the dimension flow by rule stochastic telegraph wave as the run-length flow.
+        :return: run-length flow.
+        """
+        above = self.dim[FLOW].to_numpy() > self.dim_flow_mean
+        run_starts = np.concatenate(([0], np.flatnonzero(np.diff(above)) + 1))
+        levels = np.where(above[run_starts], self.dim_flow_mean + self.dim_flow_std,
+                          self.dim_flow_mean - self.dim_flow_std)
+        return RunLengthFlow.from_run_starts(self.dim, run_starts, levels, self.flow_moments)
 
     def approximate_none(self):
         """
         Return flow as is as.
         :return: dimensionless flow
         """
-        return self.dim, self.dim[FLOW].mean(), self.dim[FLOW].std()
+        self.approximate_moments = self.flow_moments
+        return self.dim, self.flow_moments.mean, self.flow_moments.std
 
     def error_approximate(self):
         """
@@ -75,38 +112,47 @@ class ApproximateDimension:
         """
         error_approximate_dim = copy.copy(self.approximate_dim)
         error_approximate_dim[FLOW] = self.approximate_dim[FLOW] -  self.dim[FLOW]
-        return error_approximate_dim, error_approximate_dim[FLOW].mean(), error_approximate_dim[FLOW].std()
+        error_moments = Moments.from_values(error_approximate_dim[FLOW])
+        return error_approximate_dim, error_moments.mean, error_moments.std
 
     def create_tau_sequence_for_discrete_flow(self):
         """
         Creates tau sequence for the flow.
         :return: tau sequence for the flow.
         """
-        temp_tau_sequence = copy.copy(self.approximate_dim[FLOW])
-        count = 0
-        temp_tau_sequence[count] = self.approximate_dim[TIME][0]
-        for i in range(1, len(self.approximate_dim[FLOW])):
-            if self.approximate_dim[FLOW][i] != self.approximate_dim[FLOW][i-1]:
-                count += 1
-                temp_tau_sequence[count] = self.approximate_dim[TIME][i]
-
-        tau_sequence = [0.0] * count
-        for i in range(count):
-            tau_sequence[i] = temp_tau_sequence[i+1]-temp_tau_sequence[i]
-        return tau_sequence
+        flow = self.approximate_dim[FLOW].to_numpy()
+        switches = np.flatnonzero(np.diff(flow) != 0) + 1
+        switch_times = self.approximate_dim[TIME].to_numpy()[np.concatenate(([0], switches))]
+        return np.diff(switch_times).tolist()
 
     def get_approximate_dim(self) -> object:
         """
-        Returns approximate flow.
+        Returns approximate flow, the run-length flow is expanded on the time grid of the flow.
         :return: approximate flow.
         """
+        if self.approximate_dim is None:
+            return self.run_length_flow.to_frame(self.dim[TIME])
         return self.approximate_dim
 
+    def get_approximate_moments(self) -> Moments:
+        """
+        Returns moments of the approximate flow, they are calculated only if the approximation did not keep them.
+        Pass them as `moments` to CorrelationFunction of the approximate flow.
+        :return: moments of the approximate flow.
+        """
+        if self.approximate_moments is None:
+            self.approximate_moments = Moments.from_values(self.get_approximate_dim()[FLOW])
+        return self.approximate_moments
+
     def get_error_approximate_dim(self) -> object:
         """
         Returns error approximate of the flow.
         :return: error approximate of the flow.
         """
+        if self.error_approximate_dim is None:
+            error_approximate_dim = self.run_length_flow.to_frame(self.dim[TIME])
+            error_approximate_dim[FLOW] = error_approximate_dim[FLOW].to_numpy() - self.dim[FLOW].to_numpy()
+            return error_approximate_dim
         return self.error_approximate_dim
 
     def get_tau_sequence(self) -> object:
@@ -124,3 +170,13 @@ class ApproximateDimension:
 
     def get_mean_approximate_dim(self) -> object:
         return self.mean_approximate_dim
+
+    def get_harmonic_counts(self) -> object:
+        return self.harmonic_counts
+
+    def get_run_length_flow(self) -> RunLengthFlow:
+        """
+        Returns run-length flow of the telegraph wave approximations (see RUN_LENGTH), otherwise None.
+        :return: run-length flow.
+        """
+        return self.run_length_flow
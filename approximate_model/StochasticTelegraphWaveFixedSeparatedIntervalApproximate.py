@@ -1,8 +1,38 @@
-import copy
-
-import pandas as pd
+import numpy as np
 
 from constants.flow_constants import FLOW, TIME
+from common_utils.approximate_model.run_length_flow import RunLengthFlow
+from maths.moments import Moments
+
+
+def interval_edges(time_min, time_max, number_of_interval):
+    """
+    Returns edges of the equal time intervals as pd.cut creates them: the intervals are right-closed
+    and the first edge is moved left by 0.1% of the range, so time_min belongs to the first interval.
+
+    :param time_min: min time of the flow.
+    :param time_max: max time of the flow.
+    :param number_of_interval: The number of intervals.
+    :return: array of number_of_interval + 1 edges.
+    """
+    if time_min == time_max:
+        time_min = time_min - 0.001 * abs(time_min) if time_min != 0 else -0.001
+        time_max = time_max + 0.001 * abs(time_max) if time_max != 0 else 0.001
+        return np.linspace(time_min, time_max, number_of_interval + 1)
+    edges = np.linspace(time_min, time_max, number_of_interval + 1)
+    edges[0] -= (time_max - time_min) * 0.001
+    return edges
+
+
+def interval_indexes(time, edges):
+    """
+    Returns indexes of the right-closed intervals of the time points.
+
+    :param time: array of the time points.
+    :param edges: edges of the intervals.
+    :return: array of indexes.
+    """
+    return np.clip(np.searchsorted(edges, time, side="left") - 1, 0, len(edges) - 2)
 
 
 class StochasticTelegraphWaveFixedSeparatedIntervalApproximate:
@@ -16,18 +46,120 @@ class StochasticTelegraphWaveFixedSeparatedIntervalApproximate:
         (as example, minute interval).
         :return: dimensionless flow
         """
-        approximate_temp_dim = copy.copy(self.dim)
-        approximate_result_dim = copy.copy(self.dim)
-        dim_size = len(self.dim[FLOW])
+        time = self.dim[TIME].to_numpy(dtype=float)
+        flow = self.dim[FLOW].to_numpy(dtype=float)
+        indexes = interval_indexes(time, interval_edges(time.min(), time.max(), self.number_of_interval))
+
+        counts = np.bincount(indexes, minlength=self.number_of_interval)
+        sums = np.bincount(indexes, weights=flow, minlength=self.number_of_interval)
+        means = sums / np.maximum(counts, 1)
+
+        approximate_result_dim = self.dim.assign(**{FLOW: means[indexes]})
+        approximate_moments = Moments.from_values(approximate_result_dim[FLOW])
+        return approximate_result_dim, approximate_moments.mean, approximate_moments.std
+
+    def get_run_length_param(self, moments: Moments = None) -> RunLengthFlow:
+        """
+        Approximates the dimension flow by rule stochastic telegraph wave with fixed separated interval
+        and returns it as the run-length flow, the neighbouring intervals with the same mean are merged.
+        :param moments: moments of dim[FLOW] if they are already calculated.
+        :return: run-length flow.
+        """
+        time = self.dim[TIME]
+        stream = StochasticTelegraphWaveFixedSeparatedIntervalStream(time.min(), time.max(), self.number_of_interval)
+        stream.update(self.dim)
+        if moments is not None:
+            stream.flow_moments = moments
+        return stream.get_run_length_flow()
+
+
+class StochasticTelegraphWaveFixedSeparatedIntervalStream:
+    """
+    Streaming approximation by rule stochastic telegraph wave with fixed separated interval.
+    The count, sum, min and max of the flow of each interval are accumulated over the chunks of the flow
+    (the first pass), then the chunks are approximated by the means of the intervals (the second pass).
+    The time range of the whole flow must be known in advance to create the same intervals as get_param.
+    """
+
+    def __init__(self, time_min, time_max, number_of_interval):
+        """
+        :param time_min: min time of the whole flow.
+        :param time_max: max time of the whole flow.
+        :param number_of_interval: The number of intervals.
+        """
+        self.time_min = time_min
+        self.time_max = time_max
+        self.number_of_interval = number_of_interval
+        self.edges = interval_edges(time_min, time_max, number_of_interval)
+        self.counts = np.zeros(number_of_interval, dtype=np.int64)
+        self.sums = np.zeros(number_of_interval)
+        self.flow_min = np.full(number_of_interval, np.inf)
+        self.flow_max = np.full(number_of_interval, -np.inf)
+        self.first_time = np.full(number_of_interval, np.inf)
+        self.flow_moments = Moments()
+
+    def update(self, dim_chunk):
+        """
+        Adds the chunk of the flow to the sums of the intervals.
+
+        :param dim_chunk: chunk of the flow (TIME and FLOW columns).
+        :return: self.
+        """
+        time = dim_chunk[TIME].to_numpy(dtype=float)
+        flow = dim_chunk[FLOW].to_numpy(dtype=float)
+        indexes = interval_indexes(time, self.edges)
+        self.counts += np.bincount(indexes, minlength=self.number_of_interval)
+        self.sums += np.bincount(indexes, weights=flow, minlength=self.number_of_interval)
+        np.minimum.at(self.flow_min, indexes, flow)
+        np.maximum.at(self.flow_max, indexes, flow)
+        np.minimum.at(self.first_time, indexes, time)
+        self.flow_moments.update(flow)
+        return self
+
+    def get_means(self):
+        """
+        Returns means of the flow in the intervals, the means of empty intervals are nan.
+        :return: array of means.
+        """
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.sums / self.counts
 
-        approximate_temp_dim['TIME_bins'] = pd.cut(approximate_temp_dim[TIME], bins=self.number_of_interval,
-                                                   labels=False)
+    def approximate(self, dim_chunk):
+        """
+        Approximates the chunk of the flow by the means of the intervals (the chunk is not changed).
 
-        # Group by TIME_bins and calculate mean FLOW for each group
-        result = approximate_temp_dim.groupby('TIME_bins').agg({FLOW: 'mean'}).reset_index()
-        result.rename(columns={FLOW: 'Mean_FLOW'}, inplace=True)
+        :param dim_chunk: chunk of the flow (TIME and FLOW columns).
+        :return: approximate chunk.
+        """
+        indexes = interval_indexes(dim_chunk[TIME].to_numpy(dtype=float), self.edges)
+        return dim_chunk.assign(**{FLOW: self.get_means()[indexes]})
 
-        for i in range(dim_size):
-            approximate_result_dim[FLOW][i] = result['Mean_FLOW'][approximate_temp_dim['TIME_bins'][i]]
+    def get_moments(self) -> Moments:
+        """
+        Returns moments of the approximate flow calculated over the intervals.
+        :return: Moments.
+        """
+        filled = self.counts > 0
+        means = self.get_means()[filled]
+        counts = self.counts[filled]
+        dim_size = int(counts.sum())
+        mean = float(np.dot(means, counts)) / dim_size
+        return Moments(dim_size, mean, float(np.dot((means - mean) ** 2, counts)), means.min(), means.max())
 
-        return approximate_result_dim, approximate_result_dim[FLOW].mean(), approximate_result_dim[FLOW].std()
+    def get_run_length_flow(self) -> RunLengthFlow:
+        """
+        Returns the approximate flow as the run-length flow, the neighbouring intervals with the same mean
+        are merged and empty intervals are skipped.
+        :return: run-length flow.
+        """
+        filled = np.flatnonzero(self.counts > 0)
+        means = self.get_means()[filled]
+        run_starts = np.flatnonzero(np.concatenate(([True], np.diff(means) != 0)))
+        dim_size = int(self.counts.sum())
+        return RunLengthFlow(self.first_time[filled][run_starts], means[run_starts],
+                             np.add.reduceat(self.counts[filled], run_starts),
+                             np.add.reduceat(self.sums[filled], run_starts),
+                             np.minimum.reduceat(self.flow_min[filled], run_starts),
+                             np.maximum.reduceat(self.flow_max[filled], run_starts),
+                             (self.time_max - self.time_min) / (dim_size - 1) if dim_size > 1 else 0.0,
+                             self.time_max, self.flow_moments)
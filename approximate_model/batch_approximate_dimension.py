@@ -0,0 +1,211 @@
+"""
+This module provides the BatchApproximateDimension class that approximates many flows with the same time grid
+in one call. Each ApproximateType has the vectorized kernel over the 2D array (flows x samples), the flows
+are optionally split between worker processes, and the results are returned as the stacked approximate flows,
+the DataFrame of error statistics and the columnar tau sequences instead of one ApproximateDimension per flow.
+"""
+import numpy as np
+import pandas as pd
+
+from constants.flow_constants import FLOW, TIME, TAU, APPROXIMATE_TYPE, NUMBER_OF_INTERVALS, NUMBER_OF_HARMONICS, \
+    USE_HARMONIC_BASIS_CACHE, WORKERS, FLOW_INDEX, APPROXIMATE_MEAN, APPROXIMATE_STD, ERROR_MEAN, ERROR_STD
+from common_utils.approximate_model.approximate_type import ApproximateType
+from common_utils.approximate_model.StochasticTelegraphWaveFixedSeparatedIntervalApproximate import \
+    interval_edges, interval_indexes
+from maths.batch_util import stack_flows, split_by_workers, map_by_workers
+from maths.harmonic_basis_cache import HarmonicBasisCache, harmonic_basis_cache
+
+
+def approximate_none(flows, time, config):
+    """
+    Returns flows as is.
+
+    :param flows: 2D array of flows (flows x samples).
+    :param time: time grid of the flows.
+    :param config: configuration of the approximation.
+    :return: approximate flows, their means and stds.
+    """
+    return flows, flows.mean(axis=1), flows.std(axis=1, ddof=1)
+
+
+def approximate_stochastic_telegraph_wave(flows, time, config):
+    """
+    Approximates the flows by rule stochastic telegraph wave.
+
+    :param flows: 2D array of flows (flows x samples).
+    :param time: time grid of the flows.
+    :param config: configuration of the approximation.
+    :return: approximate flows, their means and stds.
+    """
+    mean = flows.mean(axis=1, keepdims=True)
+    std = flows.std(axis=1, ddof=1, keepdims=True)
+    approximate_flows = np.where(flows > mean, mean + std, mean - std)
+    return approximate_flows, approximate_flows.mean(axis=1), approximate_flows.std(axis=1, ddof=1)
+
+
+def approximate_stochastic_telegraph_wave_fixed_separated_interval(flows, time, config):
+    """
+    Approximates the flows by rule stochastic telegraph wave with fixed separated interval,
+    the intervals are the same as in StochasticTelegraphWaveFixedSeparatedIntervalApproximate.
+
+    :param flows: 2D array of flows (flows x samples).
+    :param time: time grid of the flows.
+    :param config: configuration of the approximation.
+    :return: approximate flows, their means and stds.
+    """
+    indexes = interval_indexes(time, interval_edges(time.min(), time.max(), config.get(NUMBER_OF_INTERVALS)))
+    order = np.argsort(indexes, kind="stable")
+    sorted_indexes = indexes[order]
+    starts = np.flatnonzero(np.concatenate(([True], np.diff(sorted_indexes) != 0)))
+    means = np.add.reduceat(flows[:, order], starts, axis=1) / np.diff(np.append(starts, len(order)))
+    approximate_flows = means[:, np.searchsorted(sorted_indexes[starts], indexes)]
+    return approximate_flows, approximate_flows.mean(axis=1), approximate_flows.std(axis=1, ddof=1)
+
+
+def approximate_spectrum_with_more_realization(flows, time, config):
+    """
+    Approximates the flows by the Fourier series of the parts as SpectrumWithMoreRealizationApproximate
+    with the fixed number of harmonics. The parts of all flows have the same grid, so the harmonic values
+    and the reconstruction of each part are the products of the 2D array and the trigonometric basis.
+
+    :param flows: 2D array of flows (flows x samples).
+    :param time: time grid of the flows.
+    :param config: configuration of the approximation.
+    :return: approximate flows, mean value of the first harmonic and root of summed variance from all harmonics.
+    """
+    number_of_harmonics = config.get(NUMBER_OF_HARMONICS)
+    basis_cache = harmonic_basis_cache if config.get(USE_HARMONIC_BASIS_CACHE) else HarmonicBasisCache()
+    parts = np.array_split(np.arange(flows.shape[1]), config.get(NUMBER_OF_INTERVALS))
+    approximate_flows = np.empty_like(flows)
+    cos_harmonic_values = np.empty((len(parts), flows.shape[0], number_of_harmonics))
+    sin_harmonic_values = np.empty((len(parts), flows.shape[0], number_of_harmonics))
+    for n, part in enumerate(parts):
+        cos_basis, sin_basis = basis_cache.get_basis(time[part], number_of_harmonics)
+        part_flows = flows[:, part]
+        cos_harmonic_values[n] = 2.0 / len(part) * (part_flows @ cos_basis.T)
+        sin_harmonic_values[n] = 2.0 / len(part) * (part_flows @ sin_basis.T)
+        cos_harmonic_values[n, :, 0] = part_flows.sum(axis=1) / len(part)
+        sin_harmonic_values[n, :, 0] = 0.0
+        approximate_flows[:, part] = cos_harmonic_values[n] @ cos_basis + sin_harmonic_values[n] @ sin_basis
+    std2 = 0.5 * (cos_harmonic_values.std(axis=0) ** 2 + sin_harmonic_values.std(axis=0) ** 2).sum(axis=1)
+    return approximate_flows, cos_harmonic_values[:, :, 0].mean(axis=0), np.sqrt(std2)
+
+
+APPROXIMATE_KERNELS = {
+    ApproximateType.NONE: approximate_none,
+    ApproximateType.STOCHASTIC_TELEGRAPH_WAVE: approximate_stochastic_telegraph_wave,
+    ApproximateType.STOCHASTIC_TELEGRAPH_WAVE_FIXED_SEPARATED_INTERVAL:
+        approximate_stochastic_telegraph_wave_fixed_separated_interval,
+    ApproximateType.SPECTRUM_WITH_MORE_REALIZATION: approximate_spectrum_with_more_realization,
+}
+
+
+def approximate_flows_by_type(flows, time, config):
+    """
+    Approximates the flows by the kernel of APPROXIMATE_TYPE from config.
+
+    :param flows: 2D array of flows (flows x samples).
+    :param time: time grid of the flows.
+    :param config: configuration of the approximation.
+    :return: approximate flows, their means and stds.
+    """
+    approximate_type = ApproximateType[config.get(APPROXIMATE_TYPE)]
+    kernel = APPROXIMATE_KERNELS.get(approximate_type)
+    if kernel is None:
+        raise ValueError(f"Unsupported ApproximateType: {approximate_type}")
+    return kernel(flows, time, config)
+
+
+class BatchApproximateDimension:
+    """
+    Approximation of many flows with the same time grid by ApproximateType from config.
+    """
+
+    def __init__(self, flows, approximate_config: dict = None, time=None):
+        """
+        :param flows: 2D array (flows x samples) or list of dimension flows with TIME and FLOW columns.
+        :param approximate_config: configuration of the approximation as for ApproximateDimension
+                                   and optional self.experiment["workers"].
+        :param time: time values of the 2D array (by default the time of the first dimension flow or 0, 1, 2, ...).
+        """
+        self.approximate_config = approximate_config
+        self.workers = approximate_config.get(WORKERS, 1)
+        self.flows, self.time = stack_flows(flows, time)
+
+        self.approximate_flows, self.approximate_flows_mean, self.approximate_flows_std = self.execute_approximate()
+        self.error_flows = self.approximate_flows - self.flows
+        self.tau_sequences = self.create_tau_sequences()
+
+    def execute_approximate(self):
+        """
+        Approximates all flows, the flows are split between worker processes if self.workers > 1.
+
+        :return: approximate flows, their means and stds.
+        """
+        results = map_by_workers(approximate_flows_by_type, split_by_workers(self.flows, self.workers), self.workers,
+                                 self.time, self.approximate_config)
+        return tuple(np.concatenate([result[i] for result in results]) for i in range(3))
+
+    def create_tau_sequences(self):
+        """
+        Creates tau sequences of all approximate flows.
+
+        :return: DataFrame with FLOW_INDEX and TAU columns.
+        """
+        switches = np.ones(self.approximate_flows.shape, dtype=bool)
+        switches[:, 1:] = np.diff(self.approximate_flows, axis=1) != 0
+        flow_indexes, time_indexes = np.nonzero(switches)
+        same_flow = flow_indexes[1:] == flow_indexes[:-1]
+        return pd.DataFrame({
+            FLOW_INDEX: flow_indexes[1:][same_flow],
+            TAU: np.diff(self.time[time_indexes])[same_flow],
+        })
+
+    def get_approximate_flows(self):
+        """
+        Returns approximate flows.
+        :return: array of approximate flows (flows x samples).
+        """
+        return self.approximate_flows
+
+    def get_error_approximate_flows(self):
+        """
+        Returns errors of approximate flows (approximate flow - flow).
+        :return: array of errors (flows x samples).
+        """
+        return self.error_flows
+
+    def get_approximate_dims(self):
+        """
+        Returns approximate flow of each flow.
+        :return: list of DataFrames with TIME and FLOW columns.
+        """
+        return [pd.DataFrame({TIME: self.time, FLOW: approximate_flow}) for approximate_flow in self.approximate_flows]
+
+    def get_statistics(self):
+        """
+        Returns means and stds of approximate flows and their errors.
+        :return: DataFrame with FLOW_INDEX, APPROXIMATE_MEAN, APPROXIMATE_STD, ERROR_MEAN and ERROR_STD columns.
+        """
+        return pd.DataFrame({
+            FLOW_INDEX: np.arange(len(self.flows)),
+            APPROXIMATE_MEAN: self.approximate_flows_mean,
+            APPROXIMATE_STD: self.approximate_flows_std,
+            ERROR_MEAN: self.error_flows.mean(axis=1),
+            ERROR_STD: self.error_flows.std(axis=1, ddof=1),
+        })
+
+    def get_tau_sequences(self):
+        """
+        Returns tau sequences of all flows.
+        :return: DataFrame with FLOW_INDEX and TAU columns.
+        """
+        return self.tau_sequences
+
+    def get_tau_sequence(self, flow_index):
+        """
+        Returns tau sequence of the flow.
+        :param flow_index: index of the flow.
+        :return: tau sequence for the flow.
+        """
+        return self.tau_sequences.loc[self.tau_sequences[FLOW_INDEX] == flow_index, TAU].tolist()
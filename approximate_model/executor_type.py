@@ -0,0 +1,15 @@
+"""
+Defines the ExecutorType enum used for selecting how the independent parts of the flow are processed.
+"""
+from enum import Enum
+
+
+class ExecutorType(Enum):
+    """
+    ExecutorType.
+
+    Defines the executor of the independent parts of the flow.
+    """
+    SERIAL = 1      # One part after another on a single core.
+    THREAD = 2      # Thread pool, numpy releases the GIL inside FFT and matrix products.
+    PROCESS = 3     # Process pool, the flow is placed in shared memory and the workers read zero-copy slices.
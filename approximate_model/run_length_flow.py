@@ -0,0 +1,145 @@
+"""
+This module provides the RunLengthFlow class, the run-length representation of the piecewise-constant
+approximations (stochastic telegraph wave and stochastic telegraph wave with fixed separated interval).
+The flow is kept as the switch times and the levels of the runs together with the number of points and
+the sum of the original flow in each run, so the memory is proportional to the number of switches.
+The mean, std and error statistics are calculated over the runs and the dense flow is created on demand.
+"""
+import numpy as np
+import pandas as pd
+
+from constants.flow_constants import FLOW, TIME
+from maths.moments import Moments
+
+
+class RunLengthFlow:
+    """
+    Piecewise-constant flow: the run i has the level levels[i] from switch_times[i] up to the next switch.
+    """
+
+    def __init__(self, switch_times, levels, run_counts, run_flow_sums, run_flow_min, run_flow_max,
+                 delta_time, end_time, flow_moments):
+        """
+        :param switch_times: times of the first points of the runs.
+        :param levels: levels of the runs.
+        :param run_counts: number of points of the runs.
+        :param run_flow_sums: sums of the original flow over the runs.
+        :param run_flow_min: min of the original flow over the runs.
+        :param run_flow_max: max of the original flow over the runs.
+        :param delta_time: mean time step of the original flow.
+        :param end_time: time of the last point of the original flow.
+        :param flow_moments: moments of the original flow.
+        """
+        self.switch_times = np.asarray(switch_times, dtype=float)
+        self.levels = np.asarray(levels, dtype=float)
+        self.run_counts = np.asarray(run_counts, dtype=np.int64)
+        self.run_flow_sums = np.asarray(run_flow_sums, dtype=float)
+        self.run_flow_min = np.asarray(run_flow_min, dtype=float)
+        self.run_flow_max = np.asarray(run_flow_max, dtype=float)
+        self.delta_time = delta_time
+        self.end_time = end_time
+        self.flow_moments = flow_moments
+
+    @classmethod
+    def from_run_starts(cls, dim, run_starts, levels, moments: Moments = None):
+        """
+        Creates the run-length flow from the indexes of the first points of the runs.
+
+        :param dim: dimension flow (TIME and FLOW columns).
+        :param run_starts: increasing indexes of the first points of the runs, the first index is 0.
+        :param levels: levels of the runs.
+        :param moments: moments of dim[FLOW] if they are already calculated.
+        :return: RunLengthFlow.
+        """
+        time = dim[TIME].to_numpy(dtype=float)
+        flow = dim[FLOW].to_numpy(dtype=float)
+        run_starts = np.asarray(run_starts, dtype=np.int64)
+        dim_size = len(flow)
+        return cls(time[run_starts], levels, np.diff(np.append(run_starts, dim_size)),
+                   np.add.reduceat(flow, run_starts), np.minimum.reduceat(flow, run_starts),
+                   np.maximum.reduceat(flow, run_starts),
+                   (time[-1] - time[0]) / (dim_size - 1) if dim_size > 1 else 0.0, time[-1],
+                   moments or Moments.from_values(flow))
+
+    @classmethod
+    def from_flow(cls, dim, approximate_flow, moments: Moments = None):
+        """
+        Creates the run-length flow from the dense piecewise-constant flow.
+
+        :param dim: dimension flow (TIME and FLOW columns).
+        :param approximate_flow: dense approximate flow on the time grid of dim.
+        :param moments: moments of dim[FLOW] if they are already calculated.
+        :return: RunLengthFlow.
+        """
+        approximate_flow = np.asarray(approximate_flow, dtype=float)
+        run_starts = np.concatenate(([0], np.flatnonzero(np.diff(approximate_flow) != 0) + 1))
+        return cls.from_run_starts(dim, run_starts, approximate_flow[run_starts], moments)
+
+    def __len__(self):
+        return len(self.levels)
+
+    def get_dim_size(self):
+        """
+        Returns number of points of the dense flow.
+        :return: number of points.
+        """
+        return int(self.run_counts.sum())
+
+    def get_approximate_moments(self) -> Moments:
+        """
+        Returns moments of the approximate flow calculated over the runs.
+        :return: Moments.
+        """
+        dim_size = self.get_dim_size()
+        mean = float(np.dot(self.levels, self.run_counts)) / dim_size
+        m2 = float(np.dot((self.levels - mean) ** 2, self.run_counts))
+        return Moments(dim_size, mean, m2, self.levels.min(), self.levels.max())
+
+    def get_error_moments(self) -> Moments:
+        """
+        Returns moments of the error (approximate flow - flow) calculated over the runs.
+        The sums are taken relative to the mean of the flow to avoid the cancellation.
+        :return: Moments.
+        """
+        dim_size = self.get_dim_size()
+        flow_mean = self.flow_moments.mean
+        levels = self.levels - flow_mean
+        run_flow_sums = self.run_flow_sums - flow_mean * self.run_counts
+        error_sum = float(np.dot(levels, self.run_counts) - run_flow_sums.sum())
+        error_squares = float(np.dot(levels ** 2, self.run_counts) - 2.0 * np.dot(levels, run_flow_sums)
+                              + self.flow_moments.m2)
+        error_mean = error_sum / dim_size
+        return Moments(dim_size, error_mean, max(error_squares - dim_size * error_mean ** 2, 0.0),
+                       (self.levels - self.run_flow_max).min(), (self.levels - self.run_flow_min).max())
+
+    def get_tau_sequence(self):
+        """
+        Returns tau sequence (durations between switches) of the flow.
+        :return: tau sequence.
+        """
+        return np.diff(self.switch_times).tolist()
+
+    def to_flow(self, time=None):
+        """
+        Expands the levels to the dense grid.
+
+        :param time: time grid, by default the original grid of the flow.
+        :return: array of the flow values.
+        """
+        if time is None:
+            return np.repeat(self.levels, self.run_counts)
+        indexes = np.searchsorted(self.switch_times, np.asarray(time, dtype=float), side="right") - 1
+        return self.levels[np.clip(indexes, 0, len(self.levels) - 1)]
+
+    def to_frame(self, time=None):
+        """
+        Expands the flow to the dense DataFrame.
+
+        :param time: time grid, by default the uniform grid with delta_time from the first switch
+                     up to end_time.
+        :return: DataFrame with TIME and FLOW columns.
+        """
+        if time is None:
+            time = self.switch_times[0] + np.arange(self.get_dim_size()) * self.delta_time
+            return pd.DataFrame({TIME: time, FLOW: self.to_flow()})
+        return pd.DataFrame({TIME: np.asarray(time, dtype=float), FLOW: self.to_flow(time)})
@@ -4,14 +4,64 @@ dimensionless flow data using Fourier approximation. It supports
 splitting the data into intervals, calculating harmonic components,
 and reconstructing the signal using either all or mean harmonics.
 """
-import math
-import numpy as np
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from itertools import repeat
+from multiprocessing import shared_memory
 
-import pandas as pd
-from numpy import std, mean
+import numpy as np
 
-from constants.flow_constants import TIME, FLOW, NUMBER_OF_INTERVALS, NUMBER_OF_HARMONICS
+from constants.flow_constants import TIME, FLOW, NUMBER_OF_INTERVALS, NUMBER_OF_HARMONICS, \
+    USE_HARMONIC_BASIS_CACHE, EXECUTOR_TYPE, WORKERS, HARMONIC_ENERGY_TARGET, HARMONIC_ERROR_TARGET, \
+    HARMONIC_BLOCK_SIZE
 from maths import math_util
+from maths.harmonic_basis_cache import harmonic_basis_cache
+from common_utils.approximate_model.executor_type import ExecutorType
+from common_utils.approximate_model.spectrum_result import SpectrumResult
+
+
+def part_harmonic_values(y, x, number_of_harmonics, basis_cache=None, adaptive_targets=None):
+    """
+    Compute cosine and sine harmonic values of the part of the flow.
+
+    :param y: The flow of the part.
+    :param x: The time of the part.
+    :param number_of_harmonics: The number of harmonics to compute (the max number in the adaptive mode).
+    :param basis_cache: HarmonicBasisCache, or None.
+    :param adaptive_targets: Tuple (energy target, error target, block size) of the adaptive mode, or None.
+    :return: Tuple containing cosine values and sine values.
+    """
+    if adaptive_targets is None:
+        return math_util.numeric_calculate_fourier_series(y, x, number_of_harmonics, basis_cache)
+    energy_target, error_target, block_size = adaptive_targets
+    return math_util.adaptive_fourier_series(y, x, number_of_harmonics, energy_target, error_target, block_size,
+                                             basis_cache)
+
+
+def shared_part_harmonic_values(shared_memory_name, shape, start, stop, number_of_harmonics, use_basis_cache,
+                                adaptive_targets=None):
+    """
+    Compute cosine and sine harmonic values of the part of the flow placed in shared memory.
+    The worker reads the zero-copy slice [start, stop) of the (TIME, FLOW) array.
+
+    :param shared_memory_name: The name of the shared memory block.
+    :param shape: The shape of the (TIME, FLOW) array (points x 2).
+    :param start: The first point of the part.
+    :param stop: The point after the last point of the part.
+    :param number_of_harmonics: The number of harmonics to compute.
+    :param use_basis_cache: Take the trigonometric basis from the cache of the worker.
+    :param adaptive_targets: Tuple (energy target, error target, block size) of the adaptive mode, or None.
+    :return: Tuple containing cosine values and sine values.
+    """
+    block = shared_memory.SharedMemory(name=shared_memory_name)
+    values = None
+    try:
+        values = np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+        return part_harmonic_values(values[start:stop, 1], values[start:stop, 0], number_of_harmonics,
+                                    harmonic_basis_cache if use_basis_cache else None, adaptive_targets)
+    finally:
+        # The view must be released before the block is closed.
+        values = None
+        block.close()
 
 
 class SpectrumWithMoreRealizationApproximate:
@@ -20,31 +70,105 @@ class SpectrumWithMoreRealizationApproximate:
 
     :param dim: DataFrame containing dimensionless flow data.
     :param config: Dictionary with configuration values including number of intervals and harmonics.
+                   By "harmonic_energy_target" or "harmonic_error_target" the number of harmonics of each part
+                   is chosen adaptively up to "number_of_harmonics".
     """
     def __init__(self, dim, config: dict = None):
         self.dim = dim
         self.number_of_spectrum_split_parts = config.get(NUMBER_OF_INTERVALS)
         self.number_of_harmonics = config.get(NUMBER_OF_HARMONICS)
-
+        self.basis_cache = harmonic_basis_cache if config.get(USE_HARMONIC_BASIS_CACHE) else None
+        self.executor_type = ExecutorType[config.get(EXECUTOR_TYPE, ExecutorType.SERIAL.name)]
+        self.workers = config.get(WORKERS)
+        energy_target = config.get(HARMONIC_ENERGY_TARGET)
+        error_target = config.get(HARMONIC_ERROR_TARGET)
+        self.adaptive_targets = None if energy_target is None and error_target is None \
+            else (energy_target, error_target, config.get(HARMONIC_BLOCK_SIZE, 8))
+        self.result = None
 
     def __get_harmonic_values(self, dim_parts):
         """
-        Compute cosine and sine harmonic values and their transposed matrices for each partition.
+        Compute cosine and sine harmonic values for each partition.
 
         :param dim_parts: List of DataFrame splits of the dimensionless data.
-        :return: Tuple containing cosine values, sine values, and their transposed matrices.
+        :return: Tuple containing cosine values and sine values.
         """
+        if self.executor_type == ExecutorType.THREAD:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                harmonic_values = list(executor.map(
+                    lambda dim_part: part_harmonic_values(dim_part[FLOW], dim_part[TIME], self.number_of_harmonics,
+                                                          self.basis_cache, self.adaptive_targets), dim_parts))
+            return [cos for cos, _ in harmonic_values], [sin for _, sin in harmonic_values]
+        if self.executor_type == ExecutorType.PROCESS:
+            return self.__get_shared_harmonic_values(dim_parts)
         cos_harmonic_values = [[0] * self.number_of_harmonics] * self.number_of_spectrum_split_parts
         sin_harmonic_values = [[0] * self.number_of_harmonics] * self.number_of_spectrum_split_parts
         for i in range(self.number_of_spectrum_split_parts):
             cos_harmonic_values[i], sin_harmonic_values[i] \
-                = math_util.numeric_calculate_fourier_series(dim_parts[i][FLOW], dim_parts[i][TIME],
-                                                             self.number_of_harmonics)
-        transposed_matrix_cos = [[cos_harmonic_values[k][m] for k in range(len(cos_harmonic_values))]
-                             for m in range(len(cos_harmonic_values[0]))]
-        transposed_matrix_sin = [[sin_harmonic_values[k][m] for k in range(len(sin_harmonic_values))]
-                                 for m in range(len(sin_harmonic_values[0]))]
-        return cos_harmonic_values, sin_harmonic_values, transposed_matrix_cos, transposed_matrix_sin
+                = part_harmonic_values(dim_parts[i][FLOW], dim_parts[i][TIME], self.number_of_harmonics,
+                                       self.basis_cache, self.adaptive_targets)
+        return cos_harmonic_values, sin_harmonic_values
+
+    @staticmethod
+    def pad_harmonic_values(cos_harmonic_values, sin_harmonic_values):
+        """
+        Pad the harmonic values of the parts with zeros to the largest number of harmonics.
+
+        :param cos_harmonic_values: The cosine harmonic values for each part.
+        :param sin_harmonic_values: The sine harmonic values for each part.
+        :return: Tuple containing padded cosine values, padded sine values and the numbers of harmonics of the parts.
+        """
+        harmonic_counts = [len(cos) for cos in cos_harmonic_values]
+        max_count = max(harmonic_counts)
+        return ([cos + [0.0] * (max_count - len(cos)) for cos in cos_harmonic_values],
+                [sin + [0.0] * (max_count - len(sin)) for sin in sin_harmonic_values], harmonic_counts)
+
+    def __get_shared_harmonic_values(self, dim_parts):
+        """
+        Compute cosine and sine harmonic values for each partition in worker processes.
+        The (TIME, FLOW) array is placed in shared memory once, the workers receive only the bounds of the parts.
+
+        :param dim_parts: List of DataFrame splits of the dimensionless data.
+        :return: Tuple containing cosine values and sine values.
+        """
+        stops = np.cumsum([len(dim_part) for dim_part in dim_parts])
+        starts = stops - [len(dim_part) for dim_part in dim_parts]
+        shape = (int(stops[-1]), 2)
+        block = shared_memory.SharedMemory(create=True, size=shape[0] * shape[1] * np.dtype(np.float64).itemsize)
+        values = None
+        try:
+            values = np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+            for dim_part, start, stop in zip(dim_parts, starts, stops):
+                values[start:stop, 0] = dim_part[TIME].to_numpy(dtype=float)
+                values[start:stop, 1] = dim_part[FLOW].to_numpy(dtype=float)
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                harmonic_values = list(executor.map(shared_part_harmonic_values, repeat(block.name), repeat(shape),
+                                                    starts.tolist(), stops.tolist(),
+                                                    repeat(self.number_of_harmonics),
+                                                    repeat(self.basis_cache is not None),
+                                                    repeat(self.adaptive_targets)))
+        finally:
+            # The view must be released before the block is closed, also when a worker raises.
+            values = None
+            block.close()
+            block.unlink()
+        return [cos for cos, _ in harmonic_values], [sin for _, sin in harmonic_values]
+
+    def get_result(self):
+        """
+        Split the data and compute the harmonic values once, all getters are served from this result.
+
+        :return: SpectrumResult.
+        """
+        if self.result is None:
+            dim_parts = [self.dim.iloc[part] for part in
+                         np.array_split(np.arange(len(self.dim)), self.number_of_spectrum_split_parts)]
+            cos_harmonic_values, sin_harmonic_values = self.__get_harmonic_values(dim_parts)
+            cos_harmonic_values, sin_harmonic_values, harmonic_counts \
+                = self.pad_harmonic_values(cos_harmonic_values, sin_harmonic_values)
+            self.result = SpectrumResult(dim_parts, cos_harmonic_values, sin_harmonic_values, self.basis_cache,
+                                         harmonic_counts)
+        return self.result
 
     def get_param(self):
         """
@@ -55,21 +179,7 @@ class SpectrumWithMoreRealizationApproximate:
                  - Mean value of the first harmonic (cosine),
                  - Root of summed variance from all harmonics.
         """
-        dim_parts = np.array_split(self.dim, self.number_of_spectrum_split_parts)
-        cos_harmonic_values, sin_harmonic_values, transposed_matrix_cos, transposed_matrix_sin \
-            = self.__get_harmonic_values(dim_parts)
-        mean_value = 0.0
-        std2 = 0.0
-        k_sin = 0
-        for row in transposed_matrix_cos:
-            std2 = std2 + 0.5 * std(row) ** 2 + 0.5 * std(transposed_matrix_sin[k_sin])**2 # / len(dim_parts)
-            k_sin=k_sin+1
-        mean_value = mean_value + mean(transposed_matrix_cos[0])
-
-        approximate_dim_parts = math_util.calculate_function(dim_parts, cos_harmonic_values, sin_harmonic_values)
-        approximate_array_dim = np.concatenate(approximate_dim_parts)
-        approximate_dim = pd.DataFrame(approximate_array_dim, columns=[TIME, FLOW])
-        return approximate_dim, mean_value, math.sqrt(std2)
+        return self.get_result().param
 
     def get_transposed_matrix(self):
         """
@@ -77,10 +187,7 @@ class SpectrumWithMoreRealizationApproximate:
 
         :return: Tuple containing transposed cosine and sine harmonic matrices.
         """
-        dim_parts = np.array_split(self.dim, self.number_of_spectrum_split_parts)
-        _, _, transposed_matrix_cos, transposed_matrix_sin\
-            = self.__get_harmonic_values(dim_parts)
-        return transposed_matrix_cos, transposed_matrix_sin
+        return self.get_result().transposed_matrix
 
     def get_cos_and_sin_harmonic_values(self):
         """
@@ -88,9 +195,8 @@ class SpectrumWithMoreRealizationApproximate:
 
         :return: Tuple containing cosine and sine harmonic values.
         """
-        dim_parts = np.array_split(self.dim, self.number_of_spectrum_split_parts)
-        cos_harmonic_values, sin_harmonic_values, _, _ = self.__get_harmonic_values(dim_parts)
-        return cos_harmonic_values, sin_harmonic_values
+        result = self.get_result()
+        return result.cos_harmonic_values, result.sin_harmonic_values
 
     def get_mean_by_row_of_transposed_matrix(self):
         """
@@ -98,9 +204,7 @@ class SpectrumWithMoreRealizationApproximate:
 
         :return: Tuple of arrays containing mean values for each harmonic (cosine, sine).
         """
-        dim_parts = np.array_split(self.dim, self.number_of_spectrum_split_parts)
-        _, _, transposed_matrix_cos, transposed_matrix_sin = self.__get_harmonic_values(dim_parts)
-        return np.mean(transposed_matrix_cos, axis=1), np.mean(transposed_matrix_sin, axis=1)
+        return self.get_result().mean_harmonic_values
 
     def get_mean_approximate_dim(self):
         """
@@ -108,10 +212,12 @@ class SpectrumWithMoreRealizationApproximate:
 
         :return: DataFrame containing the approximated dimensionless data using mean harmonics.
         """
-        dim_parts = np.array_split(self.dim, self.number_of_spectrum_split_parts)
-        cos_harmonic_values, sin_harmonic_values = self.get_mean_by_row_of_transposed_matrix()
-        approximate_dim_parts\
-            = math_util.calculate_function_by_mean_harmonic_values(dim_parts, cos_harmonic_values, sin_harmonic_values)
-        approximate_array_dim = np.concatenate(approximate_dim_parts)
-        approximate_dim = pd.DataFrame(approximate_array_dim, columns=[TIME, FLOW])
-        return approximate_dim
+        return self.get_result().mean_approximate_dim
+
+    def get_harmonic_counts(self):
+        """
+        Retrieve the numbers of harmonics of the parts (all equal "number_of_harmonics" without the adaptive mode).
+
+        :return: List of the numbers of harmonics.
+        """
+        return self.get_result().harmonic_counts
@@ -0,0 +1,84 @@
+"""
+This module provides the SpectrumResult class that keeps the split of the flow and the harmonic values
+of the parts, which are computed once, and derives the transposed matrices, the mean harmonic values,
+the approximation and the mean approximation lazily from them.
+"""
+import math
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+from numpy import std, mean
+
+from constants.flow_constants import TIME, FLOW
+from maths import math_util
+
+
+class SpectrumResult:
+    """
+    Result of the harmonic analysis of the parts of the flow.
+
+    :param dim_parts: List of DataFrame splits of the dimensionless data.
+    :param cos_harmonic_values: The cosine harmonic values for each part.
+    :param sin_harmonic_values: The sine harmonic values for each part.
+    :param basis_cache: HarmonicBasisCache for the reconstruction, or None.
+    :param harmonic_counts: The numbers of harmonics of the parts before padding with zeros.
+    """
+    def __init__(self, dim_parts, cos_harmonic_values, sin_harmonic_values, basis_cache=None, harmonic_counts=None):
+        self.dim_parts = dim_parts
+        self.cos_harmonic_values = cos_harmonic_values
+        self.sin_harmonic_values = sin_harmonic_values
+        self.basis_cache = basis_cache
+        self.harmonic_counts = harmonic_counts or [len(cos) for cos in cos_harmonic_values]
+
+    @cached_property
+    def transposed_matrix(self):
+        """
+        Transposed matrices of cosine and sine harmonic values (harmonics x parts).
+        """
+        transposed_matrix_cos = [[self.cos_harmonic_values[k][m] for k in range(len(self.cos_harmonic_values))]
+                                 for m in range(len(self.cos_harmonic_values[0]))]
+        transposed_matrix_sin = [[self.sin_harmonic_values[k][m] for k in range(len(self.sin_harmonic_values))]
+                                 for m in range(len(self.sin_harmonic_values[0]))]
+        return transposed_matrix_cos, transposed_matrix_sin
+
+    @cached_property
+    def mean_harmonic_values(self):
+        """
+        Mean harmonic values (cos and sin) across all parts for each harmonic.
+        """
+        transposed_matrix_cos, transposed_matrix_sin = self.transposed_matrix
+        return np.mean(transposed_matrix_cos, axis=1), np.mean(transposed_matrix_sin, axis=1)
+
+    @cached_property
+    def param(self):
+        """
+        Approximate dimensionless DataFrame, mean value of the first harmonic (cosine)
+        and root of summed variance from all harmonics.
+        """
+        transposed_matrix_cos, transposed_matrix_sin = self.transposed_matrix
+        mean_value = 0.0
+        std2 = 0.0
+        k_sin = 0
+        for row in transposed_matrix_cos:
+            std2 = std2 + 0.5 * std(row) ** 2 + 0.5 * std(transposed_matrix_sin[k_sin])**2 # / len(dim_parts)
+            k_sin=k_sin+1
+        mean_value = mean_value + mean(transposed_matrix_cos[0])
+
+        approximate_dim_parts = math_util.calculate_function(self.dim_parts, self.cos_harmonic_values,
+                                                             self.sin_harmonic_values, self.basis_cache)
+        approximate_array_dim = np.concatenate(approximate_dim_parts)
+        approximate_dim = pd.DataFrame(approximate_array_dim, columns=[TIME, FLOW])
+        return approximate_dim, mean_value, math.sqrt(std2)
+
+    @cached_property
+    def mean_approximate_dim(self):
+        """
+        Approximated dimensionless DataFrame using mean harmonics.
+        """
+        cos_harmonic_values, sin_harmonic_values = self.mean_harmonic_values
+        approximate_dim_parts\
+            = math_util.calculate_function_by_mean_harmonic_values(self.dim_parts, cos_harmonic_values,
+                                                                   sin_harmonic_values, self.basis_cache)
+        approximate_array_dim = np.concatenate(approximate_dim_parts)
+        return pd.DataFrame(approximate_array_dim, columns=[TIME, FLOW])
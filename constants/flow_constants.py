@@ -16,6 +16,25 @@ COS_HARMONIC_VALUES = "cos_harmonic_values"
 SIN_HARMONIC_VALUES = "sin_harmonic_values"
 NUMBER_OF_INTERVALS = "number_of_intervals"
 NUMBER_OF_HARMONICS = "number_of_harmonics"
+# These constants define the adaptive number of harmonics of the parts: the harmonics are computed by blocks
+# of "harmonic_block_size" up to "number_of_harmonics" and stop when the part (0..1) of the variance captured
+# by the harmonics reaches "harmonic_energy_target" or the rms error falls to "harmonic_error_target".
+HARMONIC_ENERGY_TARGET = "harmonic_energy_target"
+HARMONIC_ERROR_TARGET = "harmonic_error_target"
+HARMONIC_BLOCK_SIZE = "harmonic_block_size"
+# By "use_harmonic_basis_cache" = True the trigonometric basis of the parts is taken from the shared cache.
+USE_HARMONIC_BASIS_CACHE = "use_harmonic_basis_cache"
+# This constant defines the executor (ExecutorType) of the parts of the flow: "SERIAL", "THREAD" or "PROCESS".
+# The number of workers is defined by "workers".
+EXECUTOR_TYPE = "executor_type"
+# By "run_length" = True the telegraph wave approximations are kept as the run-length flow (switch times and
+# levels), the dense approximate flow and its error are created on demand.
+RUN_LENGTH = "run_length"
+# These constants define the columns of the error statistics of BatchApproximateDimension.
+APPROXIMATE_MEAN = "approximate_mean"
+APPROXIMATE_STD = "approximate_std"
+ERROR_MEAN = "error_mean"
+ERROR_STD = "error_std"
 STD = "std"
 
 # Dimensionless
@@ -35,7 +54,34 @@ CHARACTERISTIC_TIME_VALUE = "characteristic_time_value"
 # This approach allows to reduce the calculation correlation function, where complicity is (n/period)*(n/period).
 CORRELATION = "correlation"
 PERIOD = "period"
+# The integral correlation time: vartheta = integral of the correlation function by TIME.
+# By the lag-limited engine with the rule "ZERO_CROSSING" or "THRESHOLD" it is integrated up to the first zero.
 VARTHETA = "vartheta"
+# This constant defines the engine (CorrelationEngineType) to calculate the correlation function.
+# By "N_N_MV" the direct summation is used, by "FFT" the Wiener–Khinchin theorem is used.
+CORRELATION_ENGINE = "correlation_engine"
+# These constants define the lag-limited engine "LAG_LIMITED": max number of lags, the rule
+# (CorrelationStopType) to stop the calculation and the threshold value for the rule "THRESHOLD".
+MAX_LAG = "max_lag"
+CORRELATION_STOP_TYPE = "correlation_stop_type"
+CORRELATION_THRESHOLD = "correlation_threshold"
+# These constants define the multi-tau streaming correlator: number of lag channels per level (even)
+# and number of levels. The max lag is about number_of_channels * 2^number_of_levels points.
+NUMBER_OF_CHANNELS = "number_of_channels"
+NUMBER_OF_LEVELS = "number_of_levels"
+# This constant defines number of worker processes. By "workers" = 1 (or absent) all calculations are serial.
+WORKERS = "workers"
+# These constants define the moving-block bootstrap of the correlation function: length of block (points),
+# number of resamples, confidence level of the band (as 0.95) and seed of the random generator.
+BLOCK_LENGTH = "block_length"
+NUMBER_OF_RESAMPLES = "number_of_resamples"
+CONFIDENCE_LEVEL = "confidence_level"
+SEED = "seed"
+CORRELATION_LOWER = "correlation_lower"
+CORRELATION_UPPER = "correlation_upper"
+# This constant defines width of the lag slot for the correlation function on non-uniform time grid.
+# By default it equals the median time step of the flow.
+SLOT_WIDTH = "slot_width"
 
 # Probability
 PROBABILITY = "probability"
@@ -45,3 +91,12 @@ FLOW_PROBABILITY_Y = "flow_probability_y"
 FLOW_PROBABILITY_X = "flow_probability_x"
 FLOW_DENSITY_Y = "flow_density_y"
 CRITICAL_PROB_VALUE = "critical_prob_value"
+
+# Goodness of fit
+# This constant defines number intervals by executing the chi-square test.
+COUNT_OF_INTERVALS_XI2 = "count_of_intervals_xi2"
+FLOW_INDEX = "flow_index"
+DISTRIBUTION = "distribution"
+CHI_SQUARE = "chi_square"
+DEGREES_OF_FREEDOM = "degrees_of_freedom"
+KS_STATISTIC = "ks_statistic"
@@ -0,0 +1,118 @@
+"""
+This module provides the BootstrapCorrelationFunction class for calculating confidence bands
+of the correlation function by the moving-block bootstrap.
+"""
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from constants.flow_constants import TIME, FLOW, PERIOD, CORRELATION, WORKERS, BLOCK_LENGTH, \
+    NUMBER_OF_RESAMPLES, CONFIDENCE_LEVEL, SEED, CORRELATION_LOWER, CORRELATION_UPPER
+from corr_func.correlation_kernel import correlation_fft
+from maths.batch_util import map_by_workers
+
+RESAMPLES_BATCH_SIZE = 16
+
+
+def resample_by_blocks(flow, block_length, seed_sequence):
+    """
+    Creates a resample of the flow by the moving-block bootstrap.
+
+    :param flow: array of flow values.
+    :param block_length: The length of block (points).
+    :param seed_sequence: np.random.SeedSequence of the resample.
+    :return: resampled flow with the same size.
+    """
+    dim_size = len(flow)
+    number_of_blocks = -(-dim_size // block_length)
+    starts = np.random.default_rng(seed_sequence).integers(0, dim_size - block_length + 1, number_of_blocks)
+    indexes = (starts[:, np.newaxis] + np.arange(block_length)).ravel()[:dim_size]
+    return flow[indexes]
+
+
+def resamples_correlation(flow, seed_sequences, block_length, period, delta_tau, interval_tau):
+    """
+    Calculates correlation functions of resamples, the resamples are processed by batches in one FFT pass.
+
+    :param flow: array of flow values.
+    :param seed_sequences: list of np.random.SeedSequence, one for each resample.
+    :param block_length: The length of block (points).
+    :param period: Each period-th point is used as the lag (see PERIOD).
+    :param delta_tau: The time step of the flow.
+    :param interval_tau: The time interval of the flow (max - min).
+    :return: array of correlation values (resamples x lags).
+    """
+    correlations = []
+    for start in range(0, len(seed_sequences), RESAMPLES_BATCH_SIZE):
+        resamples = np.stack([resample_by_blocks(flow, block_length, seed_sequence)
+                              for seed_sequence in seed_sequences[start:start + RESAMPLES_BATCH_SIZE]])
+        correlations.append(correlation_fft(resamples, period, delta_tau, interval_tau)[1])
+    return np.concatenate(correlations)
+
+
+class BootstrapCorrelationFunction:
+    """
+    Creating confidence bands of correlation function, the resample i always uses the seed sequence i
+    spawned from self.experiment["seed"], so the bands do not depend on the number of workers.
+    """
+    def __init__(self, dim, config: dict = None):
+        """
+        :param dim: stochastic flow.
+        :param config: self.experiment["period"], self.experiment["block_length"],
+                       self.experiment["number_of_resamples"], self.experiment["confidence_level"],
+                       self.experiment["seed"] and self.experiment["workers"].
+        """
+        self.dim = dim
+        self.period = config[PERIOD]
+        self.block_length = config[BLOCK_LENGTH]
+        self.number_of_resamples = config.get(NUMBER_OF_RESAMPLES, 200)
+        self.confidence_level = config.get(CONFIDENCE_LEVEL, 0.95)
+        self.seed = config.get(SEED, 0)
+        self.workers = config.get(WORKERS, 1)
+
+        self.interval_tau = (dim[TIME].max() - dim[TIME].min())
+        self.delta_tau = dim[TIME][1] - dim[TIME][0]
+        self.flow = dim[FLOW].to_numpy(dtype=float)
+        if not 0 < self.block_length <= len(self.flow):
+            raise ValueError(f"Unsupported block length: {self.block_length}")
+
+        self.lags, correlation = correlation_fft(self.flow, self.period, self.delta_tau, self.interval_tau)
+        self.resample_correlations = self.execute_resamples()
+
+        alpha = (1.0 - self.confidence_level) / 2.0
+        self.correlation = pd.DataFrame()
+        self.correlation[TIME] = self.lags * self.delta_tau
+        self.correlation[CORRELATION] = correlation
+        self.correlation[CORRELATION_LOWER] = np.quantile(self.resample_correlations, alpha, axis=0)
+        self.correlation[CORRELATION_UPPER] = np.quantile(self.resample_correlations, 1.0 - alpha, axis=0)
+
+    def execute_resamples(self):
+        """
+        Executes correlation functions of all resamples, the resamples are split between
+        worker processes if self.workers > 1.
+
+        :return: array of correlation values (resamples x lags).
+        """
+        seed_sequences = np.random.SeedSequence(self.seed).spawn(self.number_of_resamples)
+        # The tasks are the batches of resamples_correlation, so the results do not depend on the workers.
+        seed_parts = [seed_sequences[start:start + RESAMPLES_BATCH_SIZE]
+                      for start in range(0, self.number_of_resamples, RESAMPLES_BATCH_SIZE)]
+        return np.concatenate(map_by_workers(partial(resamples_correlation, self.flow), seed_parts, self.workers,
+                                             self.block_length, self.period, self.delta_tau, self.interval_tau))
+
+    def get_correlation(self):
+        """
+        Returns correlation function with the lower and upper quantile curves.
+
+        :return: correlation function with TIME, CORRELATION, CORRELATION_LOWER and CORRELATION_UPPER columns.
+        """
+        return self.correlation
+
+    def get_resample_correlations(self):
+        """
+        Returns correlation functions of all resamples.
+
+        :return: array of correlation values (resamples x lags).
+        """
+        return self.resample_correlations
@@ -0,0 +1,15 @@
+"""
+Defines the CorrelationEngineType enum used for selecting the method of calculating the correlation function.
+"""
+from enum import Enum
+
+
+class CorrelationEngineType(Enum):
+    """
+    CorrelationEngineType.
+
+    Defines the way to calculate the correlation function.
+    """
+    N_N_MV = 1          # Direct summation by rule n(n-v), complicity is (n/period)*n.
+    FFT = 2             # Wiener–Khinchin theorem with zero-padded rFFT, complicity is n*log(n).
+    LAG_LIMITED = 3     # Dot product for each lag up to max_lag or the stop rule, complicity is max_lag*n.
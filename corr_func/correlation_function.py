@@ -1,22 +1,36 @@
 import copy
+from typing import Dict, Callable
 
+import numpy as np
 import pandas as pd
 
-from constants.flow_constants import TIME, FLOW, PERIOD, CORRELATION
+from constants.flow_constants import TIME, FLOW, PERIOD, CORRELATION, CORRELATION_ENGINE, MAX_LAG, \
+    CORRELATION_STOP_TYPE, CORRELATION_THRESHOLD
+from corr_func.correlation_engine_type import CorrelationEngineType
+from corr_func.correlation_stop_type import CorrelationStopType
+from corr_func.correlation_kernel import correlation_lags, lag_products_fft, normalize_lag_products
 from io_utils.console.progress import progress
+from maths.moments import Moments
 
 
 class CorrelationFunction:
     """
     Creating correlation function, that uses for calculated correlation function for dim set.
     """
-    def __init__(self, dim, config: dict = None):
+    def __init__(self, dim, config: dict = None, moments: Moments = None):
         """
         :param dim: stochastic flow.
-        :param period: self.experiment["period"].
+        :param config: self.experiment["period"] and optional self.experiment["correlation_engine"].
+                       The engine "LAG_LIMITED" uses self.experiment["max_lag"] (number of lags),
+                       self.experiment["correlation_stop_type"] and self.experiment["correlation_threshold"].
+        :param moments: moments of dim[FLOW] if they are already calculated.
         """
         self.dim = dim
         self.period = config[PERIOD]
+        self.engine = CorrelationEngineType[config.get(CORRELATION_ENGINE, CorrelationEngineType.N_N_MV.name)]
+        self.max_lag = config.get(MAX_LAG)
+        self.stop_type = CorrelationStopType[config.get(CORRELATION_STOP_TYPE, CorrelationStopType.NONE.name)]
+        self.threshold = config.get(CORRELATION_THRESHOLD, np.exp(-1.0))
 
         self.correlation = pd.DataFrame()
         self.size = round(len(dim[TIME]) / self.period / 2.0)
@@ -26,18 +40,30 @@ class CorrelationFunction:
         self.interval_tau = (dim[TIME].max() - dim[TIME].min())
         self.delta_tau = dim[TIME][1] - dim[TIME][0]
 
-        self.flow_mean = dim[FLOW].mean()
-        self.flow_std = dim[FLOW].std()
+        self.flow_moments = moments or Moments.from_values(dim[FLOW])
+        self.flow_mean = self.flow_moments.mean
+        self.flow_std = self.flow_moments.std
 
         self.correlation = self.execute_correlation()
+        self.vartheta = self.calculate_vartheta(self.correlation)
+        if self.engine == CorrelationEngineType.LAG_LIMITED and self.stop_type == CorrelationStopType.THRESHOLD:
+            self.correlation = self.cut_by_threshold(self.correlation)
 
     def execute_correlation(self):
         """
-        Executes correlation function.
+        Executes correlation function by the engine from config.
 
         :return: correlation function
         """
-        return self.execute_correlation_n_n_mv()
+        engine_methods: Dict[CorrelationEngineType, Callable[[], pd.DataFrame]] = {
+            CorrelationEngineType.N_N_MV: self.execute_correlation_n_n_mv,
+            CorrelationEngineType.FFT: self.execute_correlation_fft,
+            CorrelationEngineType.LAG_LIMITED: self.execute_correlation_lag_limited,
+        }
+        execute = engine_methods.get(self.engine)
+        if execute is not None:
+            return execute()
+        raise ValueError(f"Unsupported CorrelationEngineType: {self.engine}")
 
     def execute_correlation_n_n_mv(self):
         """
@@ -61,9 +87,94 @@ class CorrelationFunction:
         progress(self.size, self.size, "CorrelationFunction.execute_correlation_n_n_mv\n")
         return self.correlation
 
+    def execute_correlation_fft(self):
+        """
+        Executes correlation function for rule n(n-v) by the Wiener–Khinchin theorem.
+        The sums of products for all lags are calculated by zero-padded rFFT, complicity is n*log(n).
+
+        :return: correlation function.
+        """
+        dim_size = len(self.dim[TIME])
+        lags = correlation_lags(dim_size, self.period)
+        products = lag_products_fft(self.dim[FLOW].to_numpy(dtype=float) - self.flow_mean, lags)
+        correlation = pd.DataFrame()
+        correlation[TIME] = lags * self.delta_tau
+        correlation[CORRELATION] = normalize_lag_products(products, lags, dim_size, self.delta_tau,
+                                                          self.interval_tau, self.flow_std)
+        return correlation
+
+    def execute_correlation_lag_limited(self):
+        """
+        Executes correlation function for rule n(n-v) only for the lags up to max_lag or up to the lag
+        that meets the stop rule. Each lag is calculated by one dot product, complicity is max_lag*n.
+
+        :return: correlation function.
+        """
+        dim_size = len(self.dim[TIME])
+        size = self.size if self.max_lag is None else min(self.size, self.max_lag)
+        centred = self.dim[FLOW].to_numpy(dtype=float) - self.flow_mean
+        times = []
+        values = []
+        for n_v in range(size):
+            lag = n_v * self.period
+            count_2 = dim_size - lag
+            value = np.dot(centred[:count_2], centred[lag:]) * self.delta_tau
+            times.append(lag * self.delta_tau)
+            values.append(value / self.interval_tau * dim_size / count_2 / self.flow_std ** 2)
+            if self.is_stopped(values[-1]):
+                break
+        correlation = pd.DataFrame()
+        correlation[TIME] = times
+        correlation[CORRELATION] = values
+        return correlation
+
+    def is_stopped(self, value):
+        """
+        Checks the stop rule for the correlation value. The rule "THRESHOLD" also calculates the lags
+        up to the first zero crossing, so vartheta is not truncated, the frame is cut by the threshold later.
+
+        :param value: correlation value of the last lag.
+        :return: True if the calculation has to be stopped.
+        """
+        if self.stop_type in (CorrelationStopType.ZERO_CROSSING, CorrelationStopType.THRESHOLD):
+            return value <= 0.0
+        return False
+
+    def cut_by_threshold(self, correlation):
+        """
+        Cuts the correlation function after the first lag with the value less than the threshold.
+
+        :param correlation: correlation function.
+        :return: correlation function up to the threshold.
+        """
+        below = np.flatnonzero(correlation[CORRELATION].to_numpy(dtype=float) < self.threshold)
+        return correlation if len(below) == 0 else correlation.iloc[:below[0] + 1].reset_index(drop=True)
+
+    @staticmethod
+    def calculate_vartheta(correlation):
+        """
+        Calculates the integral correlation time (see VARTHETA) by the trapezoidal rule.
+
+        :param correlation: correlation function.
+        :return: integral correlation time.
+        """
+        times = correlation[TIME].to_numpy(dtype=float)
+        values = correlation[CORRELATION].to_numpy(dtype=float)
+        return float(np.sum(np.diff(times) * (values[1:] + values[:-1]) / 2.0))
+
     def get_correlation(self):
         return self.correlation;
 
+    def get_vartheta(self):
+        """
+        Returns the integral correlation time of the correlation function. By the lag-limited engine
+        the integral is taken up to the first zero crossing (or max_lag) for the rules "ZERO_CROSSING"
+        and "THRESHOLD", and by other engines over the whole frame.
+
+        :return: integral correlation time.
+        """
+        return self.vartheta
+
     @staticmethod
     def cut_by_template(template_dim, dim):
         """
@@ -0,0 +1,105 @@
+"""
+This module provides vectorized kernels for the correlation function.
+The kernels compute the lag sums of products of a centred flow by the
+Wiener–Khinchin theorem (zero-padded rFFT) and normalize them by the same
+rule n(n-v) that is used in `CorrelationFunction.execute_correlation_n_n_mv`.
+"""
+import numpy as np
+
+
+def next_fft_size(size):
+    """
+    Returns the smallest power of two that is not less than the given size.
+
+    :param size: The minimal length of the transform.
+    :return: The length of the transform.
+    """
+    return 1 << max(int(size) - 1, 0).bit_length()
+
+
+def correlation_lags(dim_size, period):
+    """
+    Creates the lag indexes that are used by the correlation function.
+
+    :param dim_size: The number of points of the flow.
+    :param period: Each period-th point is used as the lag (see PERIOD).
+    :return: array of lags (in points of the flow).
+    """
+    size = round(dim_size / period / 2.0)
+    return np.arange(size, dtype=np.int64) * period
+
+
+def lag_products_fft(centred, lags):
+    """
+    Calculates the sums of products gamma[n] * gamma[n + lag] for the given lags.
+    The last axis is the time axis, so a 2D array (realizations x samples) is processed in one pass.
+
+    :param centred: centred flow values (the mean is already subtracted).
+    :param lags: array of lags (in points of the flow).
+    :return: array of the sums with shape (..., len(lags)).
+    """
+    centred = np.asarray(centred, dtype=float)
+    dim_size = centred.shape[-1]
+    fft_size = next_fft_size(2 * dim_size)
+    spectrum = np.fft.rfft(centred, n=fft_size, axis=-1)
+    products = np.fft.irfft(spectrum * np.conj(spectrum), n=fft_size, axis=-1)
+    return products[..., np.asarray(lags, dtype=np.int64)]
+
+
+def cross_lag_products_fft(centred, lags):
+    """
+    Calculates the sums of products gamma_i[n] * gamma_j[n + lag] for all pairs of channels and the given lags.
+    The forward transform of all channels is done in one batch, the inverse one is done row by row of
+    the channel x channel matrix to keep the memory at channels x fft size.
+
+    :param centred: centred channel values (channels x samples).
+    :param lags: array of lags (in points of the flow).
+    :return: array of the sums with shape (channels, channels, len(lags)).
+    """
+    centred = np.atleast_2d(np.asarray(centred, dtype=float))
+    channels, dim_size = centred.shape
+    lags = np.asarray(lags, dtype=np.int64)
+    fft_size = next_fft_size(2 * dim_size)
+    spectrum = np.fft.rfft(centred, n=fft_size, axis=-1)
+    products = np.empty((channels, channels, len(lags)))
+    for channel in range(channels):
+        cross_spectrum = np.conj(spectrum[channel]) * spectrum
+        products[channel] = np.fft.irfft(cross_spectrum, n=fft_size, axis=-1)[:, lags]
+    return products
+
+
+def normalize_lag_products(products, lags, dim_size, delta_tau, interval_tau, flow_std):
+    """
+    Normalizes the sums of products by the rule n(n-v).
+
+    :param products: sums of products with shape (..., len(lags)).
+    :param lags: array of lags (in points of the flow).
+    :param dim_size: The number of points of the flow.
+    :param delta_tau: The time step of the flow.
+    :param interval_tau: The time interval of the flow (max - min).
+    :param flow_std: The std of the flow (scalar or array broadcast against products).
+    :return: normalized correlation values.
+    """
+    count_2 = dim_size - np.asarray(lags, dtype=float)
+    flow_std = np.asarray(flow_std, dtype=float)[..., np.newaxis]
+    return products * delta_tau / interval_tau * dim_size / count_2 / flow_std ** 2
+
+
+def correlation_fft(flows, period, delta_tau, interval_tau):
+    """
+    Calculates correlation functions of the flows by the Wiener–Khinchin theorem.
+    Each row of the 2D array (realizations x samples) is centred and scaled by its own mean and std.
+
+    :param flows: array of flow values, the last axis is the time axis.
+    :param period: Each period-th point is used as the lag (see PERIOD).
+    :param delta_tau: The time step of the flows.
+    :param interval_tau: The time interval of the flows (max - min).
+    :return: array of lags (in points of the flow) and array of correlation values with shape (..., len(lags)).
+    """
+    flows = np.asarray(flows, dtype=float)
+    dim_size = flows.shape[-1]
+    lags = correlation_lags(dim_size, period)
+    centred = flows - flows.mean(axis=-1, keepdims=True)
+    products = lag_products_fft(centred, lags)
+    return lags, normalize_lag_products(products, lags, dim_size, delta_tau, interval_tau,
+                                        flows.std(axis=-1, ddof=1))
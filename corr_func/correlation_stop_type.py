@@ -0,0 +1,16 @@
+"""
+Defines the CorrelationStopType enum used for selecting the rule to stop the lag-limited correlation function.
+"""
+from enum import Enum
+
+
+class CorrelationStopType(Enum):
+    """
+    CorrelationStopType.
+
+    Defines the rule to stop the calculation of the correlation function, the lag that meets the rule
+    is the last lag of the correlation function.
+    """
+    NONE = 1            # Only max_lag limits the calculation.
+    ZERO_CROSSING = 2   # The first lag with correlation <= 0.
+    THRESHOLD = 3       # The first lag with correlation < correlation_threshold (as example, 1/e).
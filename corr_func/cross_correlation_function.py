@@ -0,0 +1,91 @@
+"""
+This module provides the CrossCorrelationFunction class for calculating all pairwise
+cross-correlation functions of many flows (channels) with the same time grid.
+"""
+import numpy as np
+import pandas as pd
+
+from constants.flow_constants import TIME, FLOW, PERIOD, CORRELATION
+from corr_func.correlation_kernel import correlation_lags, cross_lag_products_fft, normalize_lag_products
+
+
+class CrossCorrelationFunction:
+    """
+    Creating cross-correlation functions R_ij(tau) = M[gamma_i(t) * gamma_j(t + tau)] / (std_i * std_j)
+    for all pairs of channels, the diagonal is the correlation function of CorrelationFunction.
+    """
+    def __init__(self, dim, config: dict = None, columns=None):
+        """
+        :param dim: set with TIME column and a column for each channel.
+        :param config: self.experiment["period"].
+        :param columns: names of the channel columns (by default all columns except TIME).
+        """
+        self.dim = dim
+        self.period = config[PERIOD]
+        self.channels = list(columns) if columns is not None else [column for column in dim.columns if column != TIME]
+
+        self.interval_tau = (dim[TIME].max() - dim[TIME].min())
+        self.delta_tau = dim[TIME][1] - dim[TIME][0]
+
+        self.flows = dim[self.channels].to_numpy(dtype=float).T
+        self.flow_mean = self.flows.mean(axis=1)
+        self.flow_std = self.flows.std(axis=1, ddof=1)
+
+        self.lags, self.correlation_tensor = self.execute_correlation()
+
+    @staticmethod
+    def combine_dims(dims: dict):
+        """
+        Combines FLOW columns of dim sets with the same time grid into one set,
+        for example, the flow and the approximate flow from ApproximateDimension.
+
+        :param dims: dictionary channel name -> dim set.
+        :return: set with TIME column and a column for each channel.
+        """
+        first_dim = next(iter(dims.values()))
+        combined_dim = pd.DataFrame({TIME: first_dim[TIME].to_numpy()})
+        for name, dim in dims.items():
+            combined_dim[name] = dim[FLOW].to_numpy()
+        return combined_dim
+
+    def execute_correlation(self):
+        """
+        Executes cross-correlation functions for rule n(n-v) for all pairs of channels in one FFT batch.
+
+        :return: array of lags and tensor of correlation values (channels x channels x lags).
+        """
+        dim_size = self.flows.shape[1]
+        lags = correlation_lags(dim_size, self.period)
+        products = cross_lag_products_fft(self.flows - self.flow_mean[:, np.newaxis], lags)
+        flow_std = np.sqrt(np.outer(self.flow_std, self.flow_std))
+        return lags, normalize_lag_products(products, lags, dim_size, self.delta_tau, self.interval_tau, flow_std)
+
+    def get_correlation_tensor(self):
+        """
+        Returns cross-correlation values for all pairs of channels.
+
+        :return: tensor of correlation values (channels x channels x lags).
+        """
+        return self.correlation_tensor
+
+    def get_channels(self):
+        """
+        Returns names of the channels in order of the tensor axes.
+
+        :return: names of the channels.
+        """
+        return self.channels
+
+    def get_correlation(self, first_channel, second_channel):
+        """
+        Returns cross-correlation function of two channels, the second channel is shifted by TIME.
+
+        :param first_channel: name of the first channel.
+        :param second_channel: name of the second channel.
+        :return: correlation function.
+        """
+        correlation = pd.DataFrame()
+        correlation[TIME] = self.lags * self.delta_tau
+        correlation[CORRELATION] = self.correlation_tensor[self.channels.index(first_channel),
+                                                           self.channels.index(second_channel)]
+        return correlation
@@ -0,0 +1,70 @@
+"""
+This module provides the EnsembleCorrelationFunction class for calculating correlation functions
+of many realizations of the same stochastic process in one vectorized pass.
+"""
+import numpy as np
+import pandas as pd
+
+from constants.flow_constants import TIME, PERIOD, CORRELATION, STD, WORKERS
+from corr_func.correlation_kernel import correlation_fft
+from maths.batch_util import stack_flows, split_by_workers, map_by_workers
+
+
+class EnsembleCorrelationFunction:
+    """
+    Creating correlation functions for an ensemble of realizations with the same time grid.
+    """
+    def __init__(self, flows, config: dict = None, time=None):
+        """
+        :param flows: 2D array (realizations x samples) or list of dim sets with TIME and FLOW columns.
+        :param config: self.experiment["period"] and optional self.experiment["workers"].
+        :param time: time values of the 2D array (by default the time of the first dim set or 0, 1, 2, ...).
+        """
+        self.period = config[PERIOD]
+        self.workers = config.get(WORKERS, 1)
+        self.flows, self.time = stack_flows(flows, time)
+
+        self.interval_tau = self.time.max() - self.time.min()
+        self.delta_tau = self.time[1] - self.time[0]
+
+        self.lags, self.correlations = self.execute_correlation()
+
+    def execute_correlation(self):
+        """
+        Executes correlation functions for all realizations, the realizations are split between
+        worker processes if self.workers > 1.
+
+        :return: array of lags and array of correlation values (realizations x lags).
+        """
+        results = map_by_workers(correlation_fft, split_by_workers(self.flows, self.workers), self.workers,
+                                 self.period, self.delta_tau, self.interval_tau)
+        return results[0][0], np.concatenate([correlations for _, correlations in results])
+
+    def get_correlation_matrix(self):
+        """
+        Returns correlation functions of all realizations.
+
+        :return: array of correlation values (realizations x lags).
+        """
+        return self.correlations
+
+    def get_correlations(self):
+        """
+        Returns correlation function for each realization.
+
+        :return: list of correlation functions.
+        """
+        time = self.lags * self.delta_tau
+        return [pd.DataFrame({TIME: time, CORRELATION: correlation}) for correlation in self.correlations]
+
+    def get_correlation(self):
+        """
+        Returns the ensemble mean of correlation functions and their spread (std by realizations).
+
+        :return: correlation function with TIME, CORRELATION and STD columns.
+        """
+        correlation = pd.DataFrame()
+        correlation[TIME] = self.lags * self.delta_tau
+        correlation[CORRELATION] = self.correlations.mean(axis=0)
+        correlation[STD] = self.correlations.std(axis=0, ddof=1) if len(self.correlations) > 1 else 0.0
+        return correlation
@@ -0,0 +1,130 @@
+"""
+This module provides the MultiTauCorrelator class for calculating the correlation function
+of a flow that arrives by chunks (continuous telemetry) without keeping the whole flow in memory.
+"""
+import numpy as np
+import pandas as pd
+
+from constants.flow_constants import TIME, CORRELATION, NUMBER_OF_CHANNELS, NUMBER_OF_LEVELS
+from maths.moments import Moments
+
+
+class MultiTauCorrelator:
+    """
+    Streaming correlator by the multi-tau scheme.
+
+    The level 0 keeps the lags 0, 1, ..., p - 1 (in points of the flow). Each next level works with the flow
+    averaged by pairs of points of the previous level and keeps the lags p/2, ..., p - 1 in its own points,
+    so the lag of the level l is j * 2^l points. The memory is p values per level and the work is
+    about 2p operations per sample of the flow.
+    The values are shifted by the first value of the flow before the sums are accumulated, so the sums
+    of products keep their precision for the flows with the large mean.
+    """
+    def __init__(self, delta_tau, config: dict = None):
+        """
+        :param delta_tau: The time step of the flow.
+        :param config: self.experiment["number_of_channels"] (p, even) and self.experiment["number_of_levels"].
+        """
+        config = config or {}
+        self.delta_tau = delta_tau
+        self.number_of_channels = config.get(NUMBER_OF_CHANNELS, 16)
+        self.number_of_levels = config.get(NUMBER_OF_LEVELS, 16)
+        if self.number_of_channels < 2 or self.number_of_channels % 2 != 0:
+            raise ValueError(f"Unsupported number of channels: {self.number_of_channels}")
+
+        half = self.number_of_channels // 2
+        self.level_lags = [np.arange(0 if level == 0 else half, self.number_of_channels)
+                           for level in range(self.number_of_levels)]
+        self.histories = [np.empty(0) for _ in range(self.number_of_levels)]
+        self.carries = [np.empty(0) for _ in range(self.number_of_levels)]
+        self.sum_products = [np.zeros(len(lags)) for lags in self.level_lags]
+        self.sum_direct = [np.zeros(len(lags)) for lags in self.level_lags]
+        self.sum_delayed = [np.zeros(len(lags)) for lags in self.level_lags]
+        self.counts = [np.zeros(len(lags)) for lags in self.level_lags]
+
+        self.reference = None
+        self.flow_moments = Moments()
+
+    def update(self, values):
+        """
+        Ingests the next chunk of the flow values.
+
+        :param values: chunk of the flow values.
+        :return: self.
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        if len(values) == 0:
+            return self
+        if self.reference is None:
+            self.reference = values[0]
+        values = values - self.reference
+        self.flow_moments.update(values)
+        for level in range(self.number_of_levels):
+            if len(values) == 0:
+                break
+            self.__update_level(level, values)
+            values = self.__average_by_pairs(level, values)
+        return self
+
+    def __update_level(self, level, values):
+        """
+        Accumulates the sums of products for all lags of the level.
+
+        :param level: The level of the correlator.
+        :param values: chunk of the flow values averaged for the level.
+        """
+        history = self.histories[level]
+        history_size = len(history)
+        values_size = len(values)
+        extended = np.concatenate((history, values))
+        for channel, lag in enumerate(self.level_lags[level]):
+            start = max(0, lag - history_size)
+            if start >= values_size:
+                continue
+            direct = values[start:]
+            delayed = extended[history_size + start - lag: history_size + values_size - lag]
+            self.sum_products[level][channel] += np.dot(direct, delayed)
+            self.sum_direct[level][channel] += direct.sum()
+            self.sum_delayed[level][channel] += delayed.sum()
+            self.counts[level][channel] += len(direct)
+        self.histories[level] = extended[-(self.number_of_channels - 1):]
+
+    def __average_by_pairs(self, level, values):
+        """
+        Averages the values by pairs for the next level, the odd value is kept until the next chunk.
+
+        :param level: The level of the correlator.
+        :param values: chunk of the flow values averaged for the level.
+        :return: chunk of the flow values for the next level.
+        """
+        values = np.concatenate((self.carries[level], values))
+        pairs_size = len(values) // 2 * 2
+        self.carries[level] = values[pairs_size:]
+        return (values[0:pairs_size:2] + values[1:pairs_size:2]) / 2.0
+
+    def get_correlation(self):
+        """
+        Returns correlation function for all values ingested so far.
+        The correlation is normalized by the rule n(n-v) as in CorrelationFunction.
+
+        :return: correlation function (empty before the first values).
+        """
+        correlation = pd.DataFrame({TIME: np.empty(0), CORRELATION: np.empty(0)})
+        if self.flow_moments.count == 0:
+            return correlation
+        count = self.flow_moments.count
+        flow_mean = self.flow_moments.mean
+        flow_std_2 = self.flow_moments.variance
+        times = []
+        values = []
+        for level in range(self.number_of_levels):
+            counts = self.counts[level]
+            filled = counts > 0
+            covariance = (self.sum_products[level][filled]
+                          - flow_mean * (self.sum_direct[level][filled] + self.sum_delayed[level][filled])
+                          ) / counts[filled] + flow_mean ** 2
+            times.append(self.level_lags[level][filled] * 2 ** level * self.delta_tau)
+            values.append(covariance * count / (count - 1) / flow_std_2)
+        correlation[TIME] = np.concatenate(times)
+        correlation[CORRELATION] = np.concatenate(values)
+        return correlation
@@ -0,0 +1,77 @@
+"""
+This module provides the SlottedCorrelationFunction class for calculating the correlation function
+of a flow on a non-uniform time grid without resampling it to a uniform grid.
+"""
+import numpy as np
+import pandas as pd
+
+from constants.flow_constants import TIME, FLOW, PERIOD, CORRELATION, SLOT_WIDTH
+from corr_func.correlation_kernel import lag_products_fft
+
+
+class SlottedCorrelationFunction:
+    """
+    Creating correlation function by slotting: each point gets the slot index round((t_i - t_0) / slot_width)
+    and the product gamma(t_i) * gamma(t_j) is related to the lag k * slot_width if the slot indexes of
+    the points differ by k. The lag 0 uses only the products of the point with itself.
+    The centred flow and the number of points are summed by slots, and the sums of the pairs and the numbers
+    of the pairs of all lags are the autocorrelations of these sequences by FFT, so the cost is
+    n + G * log(G), where G is the number of slots.
+    On a uniform grid with slot_width = delta_tau the result is the same as CorrelationFunction.
+    """
+    def __init__(self, dim, config: dict = None):
+        """
+        :param dim: stochastic flow with non-uniform time.
+        :param config: self.experiment["period"] and optional self.experiment["slot_width"]
+                       (by default the median of the positive time steps).
+        """
+        self.dim = dim
+        self.period = config[PERIOD]
+
+        order = np.argsort(dim[TIME].to_numpy(dtype=float), kind="stable")
+        self.time = dim[TIME].to_numpy(dtype=float)[order]
+        self.flow = dim[FLOW].to_numpy(dtype=float)[order]
+
+        self.interval_tau = self.time[-1] - self.time[0]
+        self.slot_width = config.get(SLOT_WIDTH)
+        if self.slot_width is None:
+            # The repeated timestamps are skipped, so the default width is the typical step between the points.
+            steps = np.diff(self.time)
+            steps = steps[steps > 0]
+            self.slot_width = float(np.median(steps)) if len(steps) > 0 else 0.0
+        if not self.slot_width > 0:
+            raise ValueError(f"slot_width must be positive: {self.slot_width}")
+        self.size = round((self.interval_tau / self.slot_width + 1.0) / self.period / 2.0)
+
+        self.flow_mean = self.flow.mean()
+        self.flow_std = self.flow.std(ddof=1)
+
+        self.correlation = self.execute_correlation()
+
+    def execute_correlation(self):
+        """
+        Executes correlation function for all slots.
+
+        :return: correlation function.
+        """
+        dim_size = len(self.flow)
+        centred = self.flow - self.flow_mean
+        slots = np.floor((self.time - self.time[0]) / self.slot_width + 0.5).astype(np.int64)
+        slot_sums = np.bincount(slots, weights=centred)
+        slot_counts = np.bincount(slots).astype(float)
+        lags = np.arange(self.size) * self.period
+        products, counts = lag_products_fft(np.stack((slot_sums, slot_counts)), lags)
+        counts = np.round(counts)
+
+        values = np.full(self.size, np.nan)
+        values[0] = np.dot(centred, centred) / dim_size
+        filled = counts[1:] > 0
+        values[1:][filled] = products[1:][filled] / counts[1:][filled]
+
+        correlation = pd.DataFrame()
+        correlation[TIME] = lags * self.slot_width
+        correlation[CORRELATION] = values * dim_size / (dim_size - 1) / self.flow_std ** 2
+        return correlation
+
+    def get_correlation(self):
+        return self.correlation
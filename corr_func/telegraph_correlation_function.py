@@ -0,0 +1,100 @@
+"""
+This module provides the TelegraphCorrelationFunction class for calculating the correlation function
+of the piecewise-constant (stochastic telegraph wave) flow from its switch times and levels
+without the dense samples of the flow.
+"""
+import numpy as np
+import pandas as pd
+
+from constants.flow_constants import TIME, CORRELATION, PERIOD, MAX_LAG
+from common_utils.approximate_model.run_length_flow import RunLengthFlow
+from corr_func.correlation_function import CorrelationFunction
+from corr_func.correlation_kernel import correlation_lags
+
+# The number of the shifted jump times interpolated in one block of the lags.
+INTERPOLATION_BLOCK_SIZE = 1 << 20
+
+
+class TelegraphCorrelationFunction:
+    """
+    Creating correlation function of the piecewise-constant flow: each point of the flow holds its level
+    on [t_i, t_i + delta_time), so the sum of products of the lag is the integral A(tau) of y(t) * y(t + tau).
+    With the integral Y of the flow (piecewise linear with the breakpoints at the switches) each lag is
+    A(tau) = sum(level_i * (Y(e_i + tau) - Y(s_i + tau))) over the runs [s_i, e_i), where Y is interpolated
+    at the shifted switch times. The cost is lags * runs * log(runs): the work grows with the number of switches,
+    not with the number of points, and max_lag bounds the lags. For the flows that switch every few points
+    the FFT engine on the dense flow is cheaper.
+    At the lags multiple of delta_time the result is the same as CorrelationFunction.
+    """
+    def __init__(self, run_length_flow: RunLengthFlow, config: dict = None):
+        """
+        :param run_length_flow: run-length flow (as example, ApproximateDimension.get_run_length_flow()).
+        :param config: self.experiment["period"] and optional self.experiment["max_lag"] (number of lags).
+        """
+        self.run_length_flow = run_length_flow
+        self.period = config[PERIOD]
+        self.max_lag = config.get(MAX_LAG)
+
+        self.dim_size = run_length_flow.get_dim_size()
+        self.delta_tau = run_length_flow.delta_time
+        self.interval_tau = run_length_flow.end_time - run_length_flow.switch_times[0]
+
+        self.flow_moments = run_length_flow.get_approximate_moments()
+        self.flow_mean = self.flow_moments.mean
+        self.flow_std = self.flow_moments.std
+
+        self.correlation = self.execute_correlation()
+        self.vartheta = CorrelationFunction.calculate_vartheta(self.correlation)
+
+    def execute_correlation(self):
+        """
+        Executes correlation function for the lags of CorrelationFunction.
+
+        :return: correlation function.
+        """
+        lags = correlation_lags(self.dim_size, self.period)
+        if self.max_lag is not None:
+            lags = lags[:self.max_lag]
+        taus = lags * self.delta_tau
+        values = self.calculate_overlap_integrals(taus)
+
+        correlation = pd.DataFrame()
+        correlation[TIME] = taus
+        correlation[CORRELATION] = values / self.interval_tau * self.dim_size / (self.dim_size - lags) \
+            / self.flow_std ** 2
+        return correlation
+
+    def calculate_overlap_integrals(self, taus):
+        """
+        Calculates integrals of y(t) * y(t + tau) of the centred flow over [t_0, T - tau].
+
+        :param taus: array of lags (time).
+        :return: array of integrals.
+        """
+        starts = self.run_length_flow.switch_times
+        levels = self.run_length_flow.levels - self.flow_mean
+        end = starts[0] + self.dim_size * self.delta_tau
+        jump_times = np.append(starts, end)
+        # The integral Y of the flow is piecewise linear with the breakpoints at the jump times, so the integral
+        # of y(t + tau) over the run [s_i, e_i) is Y(e_i + tau) - Y(s_i + tau), the times are clipped by T.
+        integral = np.concatenate(([0.0], np.cumsum(levels * np.diff(jump_times))))
+
+        taus = np.asarray(taus, dtype=float)
+        values = np.empty(len(taus))
+        block_size = max(1, INTERPOLATION_BLOCK_SIZE // len(jump_times))
+        for first in range(0, len(taus), block_size):
+            block_taus = taus[first:first + block_size]
+            shifted_times = np.minimum(jump_times + block_taus[:, np.newaxis], end)
+            shifted_integral = np.interp(shifted_times.ravel(), jump_times, integral).reshape(shifted_times.shape)
+            values[first:first + block_size] = np.diff(shifted_integral, axis=1) @ levels
+        return values
+
+    def get_correlation(self):
+        return self.correlation
+
+    def get_vartheta(self):
+        """
+        Returns the integral correlation time.
+        :return: vartheta.
+        """
+        return self.vartheta
@@ -8,6 +8,7 @@ from typing import Dict, Callable
 from dim_less.dimensionless_type import DimensionlessType
 from constants.flow_constants import TIME, FLOW, STD, DIMENSIONLESS_TYPE, \
     CHARACTERISTIC_FLOW_VALUE, CHARACTERISTIC_TIME_VALUE
+from maths.moments import Moments
 
 
 class Dimensionless:
@@ -15,12 +16,19 @@ class Dimensionless:
     using various standardization methods.
     """
 
-    def __init__(self, dim, config: dict = None):
+    def __init__(self, dim, config: dict = None, moments: Moments = None):
+        """
+        :param dim: dimension flow.
+        :param config: configuration of the transformation.
+        :param moments: moments of dim[FLOW] if they are already calculated.
+        """
         config = config or {}
         self.dim = dim
+        self.flow_moments = moments or Moments.from_values(dim[FLOW])
         self.dim_time_min = dim[TIME].min()
         self.dim_time_max = dim[TIME].max()
-        self.dim_flow_std = config.get(STD, dim[FLOW].std())
+        self.dim_flow_std = config[STD] if STD in config else self.flow_moments.std
+        self.flow_scale = 1.0
         self.custom_flow_value = config.get(CHARACTERISTIC_FLOW_VALUE)
         self.custom_time_value = config.get(CHARACTERISTIC_TIME_VALUE)
         self._apply_transformation(DimensionlessType[config.get(DIMENSIONLESS_TYPE)])
@@ -44,7 +52,8 @@ class Dimensionless:
         :param max_time: The max value of the dimensionless time
         :return: dimensionless flow
         """
-        self.dim_less[FLOW] = self.dim[FLOW] / self.dim_flow_std
+        self.flow_scale = self.dim_flow_std
+        self.dim_less[FLOW] = self.dim[FLOW] / self.flow_scale
         self.dim_less[TIME] = self.get_dim_less_time_on_interval(min_time, max_time)
 
     def _transform_dim_to_dim_less_by_mean(self, min_time=-1.0, max_time=1.0):
@@ -54,7 +63,8 @@ class Dimensionless:
         :param max_time: The max value of the dimensionless time
         :return: dimensionless flow
         """
-        self.dim_less[FLOW] = self.dim[FLOW] / self.dim[FLOW].mean()
+        self.flow_scale = self.flow_moments.mean
+        self.dim_less[FLOW] = self.dim[FLOW] / self.flow_scale
         self.dim_less[TIME] = self.get_dim_less_time_on_interval(min_time, max_time)
 
     def _transform_dim_to_dim_less_by_custom(self, min_time=0.0, max_time=1.0):
@@ -64,7 +74,8 @@ class Dimensionless:
         :param max_time: The max value of the dimensionless time
         :return: dimensionless flow
         """
-        self.dim_less[FLOW] = self.dim[FLOW] / self.custom_flow_value
+        self.flow_scale = self.custom_flow_value
+        self.dim_less[FLOW] = self.dim[FLOW] / self.flow_scale
         self.dim_less[TIME] = self.get_dim_less_time_on_interval(min_time, max_time / self.custom_time_value)
 
     def get_dim_less_time_on_interval(self, min_time, max_time):
@@ -84,9 +95,17 @@ class Dimensionless:
         :return: Centered dimensionless flow.
         """
         centred_dim_less = copy.deepcopy(self.dim_less)
-        centred_dim_less[FLOW] = self.dim_less[FLOW] - self.dim_less[FLOW].mean()
+        centred_dim_less[FLOW] = self.dim_less[FLOW] - self.flow_moments.mean / self.flow_scale
         return centred_dim_less
 
+    def get_dim_less_moments(self) -> Moments:
+        """
+        Returns moments of the dimensionless flow, they are the moments of the flow scaled by 1 / flow_scale.
+        Pass them as `moments` to ApproximateDimension and CorrelationFunction of the dimensionless flow.
+        :return: Moments of the dimensionless flow.
+        """
+        return self.flow_moments.scaled(1.0 / self.flow_scale)
+
     def get_dim_less(self) -> dict:
         """
         Returns the dimensionless flow.
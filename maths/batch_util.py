@@ -0,0 +1,56 @@
+"""
+This module provides the helpers of the classes that process many flows at once (EnsembleCorrelationFunction,
+BootstrapCorrelationFunction, BatchApproximateDimension): stacking of the flows into the 2D array and
+splitting of the work between worker processes.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+
+from constants.flow_constants import TIME, FLOW
+
+
+def stack_flows(flows, time=None):
+    """
+    Stacks the flows with the same time grid into the 2D array.
+
+    :param flows: 2D array (flows x samples) or list of dim sets with TIME and FLOW columns.
+    :param time: time values of the flows (by default the time of the first dim set or 0, 1, 2, ...).
+    :return: 2D array of flows (flows x samples) and array of time values.
+    """
+    if isinstance(flows, np.ndarray):
+        flows = np.atleast_2d(flows).astype(float)
+        return flows, np.arange(flows.shape[1], dtype=float) if time is None else np.asarray(time, dtype=float)
+    if len({len(dim[FLOW]) for dim in flows}) != 1:
+        raise ValueError("All flows must have the same number of points")
+    stacked_flows = np.stack([dim[FLOW].to_numpy(dtype=float) for dim in flows])
+    return stacked_flows, flows[0][TIME].to_numpy(dtype=float) if time is None else np.asarray(time, dtype=float)
+
+
+def split_by_workers(flows, workers):
+    """
+    Splits the rows of the 2D array into one part for each worker (one part for the serial run).
+
+    :param flows: 2D array of flows (flows x samples).
+    :param workers: The number of worker processes (see WORKERS).
+    :return: list of 2D arrays.
+    """
+    return np.array_split(flows, max(1, min(workers or 1, len(flows))))
+
+
+def map_by_workers(function, parts, workers, *args):
+    """
+    Calls function(part, *args) for each part, the parts are processed by worker processes if workers > 1.
+    The function must be defined at module level to be passed to the worker processes.
+
+    :param function: The function of the part and the common arguments.
+    :param parts: list of parts.
+    :param workers: The number of worker processes (see WORKERS).
+    :param args: The common arguments of all parts.
+    :return: list of results in the order of the parts.
+    """
+    if workers is None or workers <= 1:
+        return [function(part, *args) for part in parts]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(function, parts, *[repeat(arg) for arg in args]))
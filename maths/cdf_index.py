@@ -0,0 +1,93 @@
+"""
+This module provides the CdfIndex class, a cumulative distribution function that is built once
+and answers batches of value -> probability and probability -> value (as example, CRITICAL_PROB_VALUE)
+queries by vectorized binary search.
+"""
+import numpy as np
+
+
+class CdfIndex:
+    """
+    Cumulative distribution function on the increasing grid of values.
+    Between the grid points the function is a step function or a linear interpolation.
+    """
+
+    def __init__(self, values_grid, probabilities_grid):
+        """
+        :param values_grid: increasing values of the grid.
+        :param probabilities_grid: non-decreasing cumulative probabilities at the values of the grid.
+        """
+        self.values_grid = np.asarray(values_grid, dtype=float)
+        self.probabilities_grid = np.asarray(probabilities_grid, dtype=float)
+
+    @classmethod
+    def from_values(cls, values):
+        """
+        Creates the empirical cumulative distribution function of the values.
+
+        :param values: values of the flow.
+        :return: CdfIndex.
+        """
+        values_grid, counts = np.unique(np.asarray(values, dtype=float), return_counts=True)
+        return cls(values_grid, np.cumsum(counts) / counts.sum())
+
+    @classmethod
+    def from_probability_frame(cls, probability, y_name="y", x_name="x", delta=None):
+        """
+        Creates the cumulative distribution function from the frame of `calculate_probability`.
+        The left edge of the first interval is added with the probability 0, so the function rises
+        across the first interval instead of jumping at its right edge.
+
+        :param probability: DataFrame with the cumulative probability.
+        :param y_name: The name of the probability column.
+        :param x_name: The name of the column with the right edges of the intervals.
+        :param delta: The width of the intervals as returned with the frame (float, or array for bin_edges),
+                      by default the distance between the first two right edges.
+        :return: CdfIndex.
+        """
+        values_grid = probability[x_name].to_numpy(dtype=float)
+        if delta is None:
+            if len(values_grid) < 2:
+                raise ValueError("delta is required for the frame with one interval")
+            delta = values_grid[1] - values_grid[0]
+        first_delta = np.ravel(delta)[0]
+        return cls(np.concatenate(([values_grid[0] - first_delta], values_grid)),
+                   np.concatenate(([0.0], probability[y_name].to_numpy(dtype=float))))
+
+    def probability(self, values, interpolate=True):
+        """
+        Returns the cumulative probabilities of the values.
+
+        :param values: value or array of values.
+        :param interpolate: linear interpolation between the grid points, otherwise the step function.
+        :return: probability or array of probabilities.
+        """
+        if interpolate:
+            return np.interp(values, self.values_grid, self.probabilities_grid, left=0.0, right=1.0)
+        indexes = np.searchsorted(self.values_grid, values, side="right") - 1
+        probabilities = np.where(indexes >= 0, self.probabilities_grid[np.maximum(indexes, 0)], 0.0)
+        return probabilities[()]
+
+    def value(self, probabilities, interpolate=True):
+        """
+        Returns the values for the cumulative probabilities (the inverse function).
+
+        :param probabilities: probability or array of probabilities.
+        :param interpolate: linear interpolation between the grid points, otherwise the smallest grid value
+                            with the cumulative probability not less than the given one.
+        :return: value or array of values.
+        """
+        if interpolate:
+            return np.interp(probabilities, self.probabilities_grid, self.values_grid)
+        indexes = np.searchsorted(self.probabilities_grid, probabilities, side="left")
+        return self.values_grid[np.minimum(indexes, len(self.values_grid) - 1)]
+
+    def critical_value(self, critical_probability, interpolate=True):
+        """
+        Returns the critical value of the flow for the critical probability (see CRITICAL_PROB_VALUE).
+
+        :param critical_probability: probability or array of probabilities.
+        :param interpolate: linear interpolation between the grid points.
+        :return: value or array of values.
+        """
+        return self.value(critical_probability, interpolate)
@@ -0,0 +1,15 @@
+"""
+Defines the DistributionType enum used for selecting distributions that are fitted to flows.
+"""
+from enum import Enum
+
+
+class DistributionType(Enum):
+    """
+    DistributionType.
+
+    Defines the distribution that is fitted to the flow values by the method of moments.
+    """
+    NORMAL = 1          # mean, std.
+    UNIFORM = 2         # mean = (min + max) / 2, min_value = min.
+    EXPONENTIAL = 3     # mean.
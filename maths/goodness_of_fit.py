@@ -0,0 +1,86 @@
+"""
+This module provides the batched goodness-of-fit tests (chi-square and Kolmogorov–Smirnov)
+of candidate distributions against many flows. The parameters of the distributions are fitted
+to each flow by the method of moments and all flows are scored in one vectorized pass.
+"""
+import numpy as np
+import pandas as pd
+
+from constants.flow_constants import FLOW_INDEX, DISTRIBUTION, CHI_SQUARE, DEGREES_OF_FREEDOM, KS_STATISTIC
+from maths.distribution_type import DistributionType
+from maths.stats import normal_cdf, uniform_cdf, exponential_cdf
+
+
+def fit_cdf(distribution_type, flows):
+    """
+    Fits the distribution to each flow and returns its cumulative distribution function.
+
+    :param distribution_type: DistributionType.
+    :param flows: array of flow values (flows x samples).
+    :return: function of values (flows x points) and number of fitted parameters.
+    """
+    mean = flows.mean(axis=1, keepdims=True)
+    if distribution_type == DistributionType.NORMAL:
+        std = flows.std(axis=1, ddof=1, keepdims=True)
+        return lambda values: normal_cdf(values, mean, std), 2
+    if distribution_type == DistributionType.UNIFORM:
+        min_value = flows.min(axis=1, keepdims=True)
+        max_value = flows.max(axis=1, keepdims=True)
+        return lambda values: uniform_cdf(values, (min_value + max_value) / 2.0, min_value), 2
+    if distribution_type == DistributionType.EXPONENTIAL:
+        return lambda values: exponential_cdf(values, mean), 1
+    raise ValueError(f"Unsupported DistributionType: {distribution_type}")
+
+
+def goodness_of_fit(flows, distribution_types, intervals):
+    """
+    Scores the candidate distributions against the flows by the chi-square and Kolmogorov–Smirnov statistics.
+    The chi-square test uses `intervals` equal intervals between min and max of each flow,
+    the intervals with zero expected count are skipped.
+
+    :param flows: 2D array (flows x samples) or list of flows with the same number of values.
+    :param distribution_types: list of DistributionType (or their names).
+    :param intervals: The number of intervals of the chi-square test (see COUNT_OF_INTERVALS_XI2).
+    :return: DataFrame with FLOW_INDEX, DISTRIBUTION, CHI_SQUARE, DEGREES_OF_FREEDOM and KS_STATISTIC columns.
+    """
+    flows = np.atleast_2d(np.asarray(flows, dtype=float))
+    number_of_flows, dim_size = flows.shape
+    sorted_flows = np.sort(flows, axis=1)
+
+    min_value = sorted_flows[:, :1]
+    max_value = sorted_flows[:, -1:]
+    width = np.where(max_value > min_value, max_value - min_value, 1.0)
+    bin_edges = min_value + width * np.arange(intervals + 1) / intervals
+    indexes = np.clip(((sorted_flows - min_value) / width * intervals).astype(np.int64), 0, intervals - 1)
+    observed = np.bincount((indexes + np.arange(number_of_flows)[:, np.newaxis] * intervals).ravel(),
+                           minlength=number_of_flows * intervals).reshape(number_of_flows, intervals)
+
+    ecdf_upper = np.arange(1, dim_size + 1) / dim_size
+    ecdf_lower = np.arange(dim_size) / dim_size
+
+    results = []
+    for distribution_type in distribution_types:
+        if not isinstance(distribution_type, DistributionType):
+            distribution_type = DistributionType[distribution_type]
+        cdf, number_of_parameters = fit_cdf(distribution_type, flows)
+
+        probabilities = cdf(sorted_flows)
+        ks_statistic = np.maximum((ecdf_upper - probabilities).max(axis=1),
+                                  (probabilities - ecdf_lower).max(axis=1))
+
+        edges_probabilities = cdf(bin_edges)
+        edges_probabilities[:, 0] = 0.0
+        edges_probabilities[:, -1] = 1.0
+        expected = np.diff(edges_probabilities, axis=1) * dim_size
+        valid = expected > 0.0
+        chi_square = np.where(valid, (observed - expected) ** 2 / np.where(valid, expected, 1.0), 0.0).sum(axis=1)
+        degrees_of_freedom = valid.sum(axis=1) - 1 - number_of_parameters
+
+        results.append(pd.DataFrame({
+            FLOW_INDEX: np.arange(number_of_flows),
+            DISTRIBUTION: distribution_type.name,
+            CHI_SQUARE: chi_square,
+            DEGREES_OF_FREEDOM: degrees_of_freedom,
+            KS_STATISTIC: ks_statistic,
+        }))
+    return pd.concat(results, ignore_index=True)
@@ -0,0 +1,93 @@
+"""
+This module provides the HarmonicBasisCache class that keeps the trigonometric basis
+cos(z * k * (x - x_min)) and sin(z * k * (x - x_min)) of the parts of the flow. The basis depends only
+on the size of the part, the number of harmonics and the normalized grid (x - x_min) / l, so the parts
+of the same layout in repeated runs over many flows share one basis and the harmonic analysis and
+the reconstruction are reduced to matrix products.
+"""
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# The normalized grid is rounded before hashing, so the parts with the same layout but other time offset
+# get the same key.
+NORMALIZED_GRID_DECIMALS = 12
+
+
+class HarmonicBasisCache:
+    """
+    Least recently used cache of the trigonometric bases with bounded memory.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        """
+        :param max_bytes: The max memory of all bases, the least recently used bases are evicted.
+        """
+        self.max_bytes = max_bytes
+        self.bases = OrderedDict()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def normalize(x):
+        """
+        Returns min x, the length of the grid and the normalized grid (x - x_min) / l.
+
+        :param x: array of the x-coordinates.
+        :return: x_min, l and the normalized grid.
+        """
+        x = np.asarray(x, dtype=float)
+        x_min = x.min()
+        l = x.max() - x_min
+        return x_min, l, (x - x_min) / l
+
+    def get_basis(self, x, number_of_harmonics):
+        """
+        Returns the basis for the grid, the basis is calculated on the first request.
+
+        :param x: array of the x-coordinates.
+        :param number_of_harmonics: The number of harmonics.
+        :return: cos basis and sin basis (number_of_harmonics x len(x)).
+        """
+        _, _, normalized_grid = self.normalize(x)
+        grid_hash = hashlib.blake2b(np.round(normalized_grid, NORMALIZED_GRID_DECIMALS).tobytes(),
+                                    digest_size=16).digest()
+        key = (len(normalized_grid), number_of_harmonics, grid_hash)
+        with self.lock:
+            basis = self.bases.get(key)
+            if basis is not None:
+                self.hits += 1
+                self.bases.move_to_end(key)
+                return basis
+            self.misses += 1
+
+        angles = 2 * math.pi * np.outer(np.arange(number_of_harmonics), normalized_grid)
+        basis = (np.cos(angles), np.sin(angles))
+        basis_bytes = basis[0].nbytes + basis[1].nbytes
+        if basis_bytes > self.max_bytes:
+            return basis
+        with self.lock:
+            if key not in self.bases:
+                self.bases[key] = basis
+                self.size_bytes += basis_bytes
+            while self.size_bytes > self.max_bytes:
+                _, (cos_basis, sin_basis) = self.bases.popitem(last=False)
+                self.size_bytes -= cos_basis.nbytes + sin_basis.nbytes
+        return basis
+
+    def clear(self):
+        """
+        Removes all bases.
+        """
+        with self.lock:
+            self.bases.clear()
+            self.size_bytes = 0
+
+
+# The cache shared by the harmonic analysis and the reconstruction (see USE_HARMONIC_BASIS_CACHE).
+harmonic_basis_cache = HarmonicBasisCache()
@@ -1,28 +1,48 @@
 import math
-from copy import deepcopy
+
+import numpy as np
 
 from constants.flow_constants import TIME, FLOW
 
 
 def search(f, f_value, i_left, i_reight):
-    if f_value -  f[i_left] < 0:
-        return -1
-    if f_value - f[i_reight] > 0:
-        return -1
-
-    midPoint= round((i_left + i_reight) / 2)
-    if i_left == i_reight:
-        return midPoint
-    if i_left +1 == i_reight:
-        if (f_value -  f[i_left]) > (f[i_reight] - f_value):
-            return i_reight
-        else:
-            return i_left
+    """
+    Returns the index of the nearest to f_value point of the sorted f between i_left and i_reight,
+    or -1 if f_value is out of [f[i_left], f[i_reight]]. The thin wrapper of search_sorted.
+    """
+    f_values = f.loc[i_left:i_reight].to_numpy() if hasattr(f, "loc") else np.asarray(f)[i_left:i_reight + 1]
+    index = search_sorted(f_values, f_value)
+    return int(index) + i_left if index >= 0 else -1
+
+
+def search_sorted(f, f_values, side="nearest", clamp=False):
+    """
+    Returns the indexes of the points of the sorted array for all query values in one call.
 
-    if f_value > f[midPoint]:
-        return search(f, f_value, midPoint, i_reight)
+    :param f: increasing array.
+    :param f_values: query value or array of query values.
+    :param side: "left" - the last point f[i] <= value, "right" - the first point f[i] >= value,
+                 "nearest" - the nearest point (the left one for equal distances).
+    :param clamp: True - the values out of [f[0], f[-1]] get the index of the first or the last point,
+                  False - they get -1.
+    :return: index or array of indexes.
+    """
+    f = np.asarray(f, dtype=float)
+    f_values = np.asarray(f_values, dtype=float)
+    last = len(f) - 1
+    right = np.clip(np.searchsorted(f, f_values, side="left"), 0, last)
+    left = np.clip(np.searchsorted(f, f_values, side="right") - 1, 0, last)
+    if side == "left":
+        indexes = left
+    elif side == "right":
+        indexes = right
+    elif side == "nearest":
+        indexes = np.where(f_values - f[left] > f[right] - f_values, right, left)
     else:
-        return search(f, f_value, i_left, midPoint )
+        raise ValueError(f"Unsupported side: {side}")
+    if not clamp:
+        indexes = np.where((f_values < f[0]) | (f_values > f[last]), -1, indexes)
+    return indexes[()]
 
 
 def H(x):
@@ -32,7 +52,7 @@ def H(x):
         return 0.0
 
 # ================= numeric way to calculate the fourier coefficients ==================================================
-def numeric_calculate_fourier_series(y, x, number_of_harmonics):
+def numeric_calculate_fourier_series(y, x, number_of_harmonics, basis_cache=None):
     """
        Compute the cosine and sine harmonic values for the Fourier series expansion of a given dataset.
            y = a0/2 + ai * cos + bi * sin
@@ -48,6 +68,8 @@ def numeric_calculate_fourier_series(y, x, number_of_harmonics):
            The y-coordinates of the data points corresponding to the x-coordinates.
        number_of_harmonics : int
            The number of harmonics to compute.
+       basis_cache : HarmonicBasisCache, optional
+           The cache of the trigonometric basis, the harmonic values are the products of the cached basis and y.
 
        Returns:
        --------
@@ -62,6 +84,8 @@ def numeric_calculate_fourier_series(y, x, number_of_harmonics):
        - The x-coordinates are used to compute the intervals and the range over which
          the Fourier series is calculated.
        - The y-coordinates represent the function values at the corresponding x-coordinates.
+       - On the uniform grid the sums are computed by FFT, otherwise by the product of the
+         trigonometric matrix and y.
 
        Example:
        --------
@@ -75,59 +99,227 @@ def numeric_calculate_fourier_series(y, x, number_of_harmonics):
        [some_values]
        :type y: object
        """
-    start_x = x.keys().start
+    # x and y are the columns of one part, so y is taken by the labels of x (from x.keys().start).
+    x_values = np.asarray(x, dtype=float)
+    y_values = np.asarray(y[x.keys()] if hasattr(x, "keys") else y, dtype=float)
+    elements_size = len(x_values)
+    if basis_cache is not None:
+        cos_basis, sin_basis = basis_cache.get_basis(x_values, number_of_harmonics)
+        cos_harmonic_values = 2.0 / elements_size * (cos_basis @ y_values)
+        sin_harmonic_values = 2.0 / elements_size * (sin_basis @ y_values)
+    elif is_uniform_grid(x_values):
+        cos_harmonic_values, sin_harmonic_values = fft_fourier_series(y_values, number_of_harmonics)
+    else:
+        cos_harmonic_values, sin_harmonic_values = matrix_fourier_series(y_values, x_values, number_of_harmonics)
+    cos_harmonic_values[0] = y_values.sum() / elements_size
+    sin_harmonic_values[0] = 0.0
+    return cos_harmonic_values.tolist(), sin_harmonic_values.tolist()
+
+
+def is_uniform_grid(x):
+    """
+    Checks that the grid is increasing with the constant step.
+
+    :param x: array of the x-coordinates.
+    :return: True for the uniform grid.
+    """
+    if len(x) < 3:
+        return False
+    steps = np.diff(x)
+    return steps[0] > 0 and np.allclose(steps, steps[0], rtol=1e-9, atol=0.0)
+
+
+def fft_fourier_series(y, number_of_harmonics):
+    """
+    Computes the harmonic values on the uniform grid by FFT.
+    On the grid x_n = x_min + n * l / (N - 1) the angle z * k * (x_n - x_min) is 2 * pi * k * n / (N - 1),
+    so the last point is added to the first one and the DFT of length N - 1 gives the sums for all harmonics.
+
+    :param y: array of the y-coordinates.
+    :param number_of_harmonics: The number of harmonics to compute.
+    :return: arrays of cosine and sine harmonic values (2 / N * sums).
+    """
+    elements_size = len(y)
+    period_size = elements_size - 1
+    folded = y[:period_size].copy()
+    folded[0] += y[period_size]
+    spectrum = np.fft.fft(folded)[np.arange(number_of_harmonics) % period_size]
+    return 2.0 / elements_size * spectrum.real, -2.0 / elements_size * spectrum.imag
+
+
+def matrix_fourier_series(y, x, number_of_harmonics, block_size=65536, first_harmonic=0):
+    """
+    Computes the harmonic values on the irregular grid by the product of the trigonometric matrix and y.
+    The matrix is built by blocks of points to keep the memory at number_of_harmonics * block_size.
+
+    :param y: array of the y-coordinates.
+    :param x: array of the x-coordinates.
+    :param number_of_harmonics: The number of harmonics to compute.
+    :param block_size: The number of points in the block.
+    :param first_harmonic: The first harmonic to compute, the harmonics first_harmonic..number_of_harmonics - 1
+                           are computed.
+    :return: arrays of cosine and sine harmonic values (2 / N * sums).
+    """
     elements_size = len(x)
-    x_min = min(x)
-    l = max(x) - x_min
-    z = 2 * math.pi / l
-    delta_x = l / elements_size
-    cos_harmonic_values = [0.0] * number_of_harmonics
-    sin_harmonic_values = [0.0] * number_of_harmonics
-    for num in range(number_of_harmonics):
-        sin_harmonic_value = 0.0
-        cos_harmonic_value = 0.0
-        for n in range(start_x, elements_size + start_x):
-            x_ = x[n]
-            if num == 0:
-                cos_harmonic_value = cos_harmonic_value + 1.0 / l * y[n] * delta_x
-            else:
-                cos_harmonic_value = cos_harmonic_value + 2.0 / l * y[n] * math.cos(z * num * (x_ - x_min)) * delta_x
-                sin_harmonic_value = sin_harmonic_value + 2.0 / l * y[n] * math.sin(z * num * (x_ - x_min)) * delta_x
-        cos_harmonic_values[num] = cos_harmonic_value
-        sin_harmonic_values[num] = sin_harmonic_value
+    x_min = x.min()
+    z = 2 * math.pi / (x.max() - x_min)
+    harmonics = np.arange(first_harmonic, number_of_harmonics)
+    cos_harmonic_values = np.zeros(len(harmonics))
+    sin_harmonic_values = np.zeros(len(harmonics))
+    for start in range(0, elements_size, block_size):
+        angles = z * np.outer(harmonics, x[start:start + block_size] - x_min)
+        cos_harmonic_values += np.cos(angles) @ y[start:start + block_size]
+        sin_harmonic_values += np.sin(angles) @ y[start:start + block_size]
+    return 2.0 / elements_size * cos_harmonic_values, 2.0 / elements_size * sin_harmonic_values
+
+def adaptive_fourier_series(y, x, max_harmonics, energy_target=None, error_target=None, block_size=8,
+                            basis_cache=None):
+    """
+    Computes the harmonic values in increasing order and stops at the first number of harmonics
+    that captures energy_target of the variance of y or leaves the rms error not greater than error_target.
+    The energy of the harmonic k is estimated as (ak^2 + bk^2) / 2 (Parseval's theorem), so the rms error of
+    h harmonics is estimated as sqrt(variance - sum of energies). With the 2 / N scaling and the endpoint
+    of the part the harmonics are not exactly orthogonal even on the uniform grid, so the targets are met
+    approximately. On the uniform grid all harmonics are computed by one FFT, otherwise (and with the basis
+    cache) they are computed by blocks of block_size harmonics and the computation stops with the count.
+
+    :param y: array (or Series) of the y-coordinates.
+    :param x: array (or Series) of the x-coordinates.
+    :param max_harmonics: The max number of harmonics (see NUMBER_OF_HARMONICS).
+    :param energy_target: The part of the variance (0..1) captured by the harmonics, or None.
+    :param error_target: The rms error of the approximation, or None.
+    :param block_size: The number of harmonics computed at once on the irregular grid.
+    :param basis_cache: HarmonicBasisCache, the harmonic values are the products of the cached basis and y.
+    :return: lists of cosine and sine harmonic values of the chosen number of harmonics.
+    """
+    x_values = np.asarray(x, dtype=float)
+    y_values = np.asarray(y[x.keys()] if hasattr(x, "keys") else y, dtype=float)
+    elements_size = len(x_values)
+    mean_value = y_values.sum() / elements_size
+    variance = np.mean((y_values - mean_value) ** 2)
+    residual_targets = []
+    if energy_target is not None:
+        residual_targets.append((1.0 - energy_target) * variance)
+    if error_target is not None:
+        residual_targets.append(error_target ** 2)
+    residual_target = max(residual_targets) if residual_targets else -np.inf
+
+    cos_basis = sin_basis = cos_all = sin_all = None
+    if basis_cache is not None:
+        cos_basis, sin_basis = basis_cache.get_basis(x_values, max_harmonics)
+    elif is_uniform_grid(x_values):
+        cos_all, sin_all = fft_fourier_series(y_values, max_harmonics)
+    cos_harmonic_values = []
+    sin_harmonic_values = []
+    energy = 0.0
+    for first in range(0, max_harmonics, block_size):
+        last = min(first + block_size, max_harmonics)
+        if cos_basis is not None:
+            cos_block = 2.0 / elements_size * (cos_basis[first:last] @ y_values)
+            sin_block = 2.0 / elements_size * (sin_basis[first:last] @ y_values)
+        elif cos_all is not None:
+            cos_block, sin_block = cos_all[first:last].copy(), sin_all[first:last].copy()
+        else:
+            cos_block, sin_block = matrix_fourier_series(y_values, x_values, last, first_harmonic=first)
+        if first == 0:
+            cos_block[0] = mean_value
+            sin_block[0] = 0.0
+        energies = 0.5 * (cos_block ** 2 + sin_block ** 2)
+        if first == 0:
+            energies[0] = 0.0
+        residuals = variance - (energy + np.cumsum(energies))
+        reached = np.flatnonzero(residuals <= residual_target)
+        if len(reached) > 0:
+            count = reached[0] + 1
+            cos_harmonic_values.extend(cos_block[:count].tolist())
+            sin_harmonic_values.extend(sin_block[:count].tolist())
+            break
+        cos_harmonic_values.extend(cos_block.tolist())
+        sin_harmonic_values.extend(sin_block.tolist())
+        energy += energies.sum()
     return cos_harmonic_values, sin_harmonic_values
 
 # ================= numeric way to calculate the function values =======================================================
-def calculate_function(dim_parts, cos_harmonic_values, sin_harmonic_values):
-    temp_dim_parts = deepcopy(dim_parts)
-    for n in range(len(dim_parts)):
-        x_s = temp_dim_parts[n][TIME]
-        x_min = min(x_s)
-        l = max(x_s) - x_min
-        z = 2 * math.pi / l
-        start_tau = temp_dim_parts[n][TIME].keys().start
-        for i in range(start_tau, len(x_s) + start_tau):
-            flow_value = 0.0
-            x = x_s[i]
-            for k in range(len(cos_harmonic_values[n])):
-                flow_value = (flow_value + cos_harmonic_values[n][k] * math.cos(z * k * (x - x_min))
-                                  + sin_harmonic_values[n][k] * math.sin(z * k * (x - x_min)))
-            temp_dim_parts[n][FLOW][i] = flow_value
-    return temp_dim_parts
+def evaluate_fourier_series(x, x_min, l, cos_harmonic_values, sin_harmonic_values, out=None):
+    """
+    Evaluates y = sum(ak * cos(z * k * (x - x_min)) + bk * sin(z * k * (x - x_min))), z = 2 * pi / l,
+    for all points at once. cos and sin of the harmonic k + 1 are obtained from the harmonic k by
+    the angle-addition recurrence, so only cos and sin of the first harmonic are calculated.
+
+    :param x: array of the x-coordinates (the points of the part or an arbitrary dense query grid).
+    :param x_min: The min x of the part.
+    :param l: The length of the part (max x - min x).
+    :param cos_harmonic_values: The cosine harmonic values.
+    :param sin_harmonic_values: The sine harmonic values.
+    :param out: preallocated output array with the size of x.
+    :return: array of the function values.
+    """
+    theta = 2 * math.pi / l * (np.asarray(x, dtype=float) - x_min)
+    cos_1 = np.cos(theta)
+    sin_1 = np.sin(theta)
+    cos_k = np.ones_like(theta)
+    sin_k = np.zeros_like(theta)
+    if out is None:
+        out = np.empty_like(theta)
+    out[:] = cos_harmonic_values[0] if len(cos_harmonic_values) > 0 else 0.0
+    for k in range(1, len(cos_harmonic_values)):
+        cos_k, sin_k = cos_k * cos_1 - sin_k * sin_1, sin_k * cos_1 + cos_k * sin_1
+        out += cos_harmonic_values[k] * cos_k + sin_harmonic_values[k] * sin_k
+    return out
+
+
+def reconstruct_fourier_series(dim_parts, cos_harmonic_values, sin_harmonic_values, out=None, basis_cache=None):
+    """
+    Evaluates the Fourier series of each part on the TIME points of the part.
 
-def calculate_function_by_mean_harmonic_values(dim_parts, cos_harmonic_values, sin_harmonic_values):
-    temp_dim_parts = deepcopy(dim_parts)
-    for n in range(len(dim_parts)):
-        x_s = temp_dim_parts[n][TIME]
-        x_min = min(x_s)
-        l = max(x_s) - x_min
-        z = 2 * math.pi / l
-        start_tau = temp_dim_parts[n][TIME].keys().start
-        for i in range(start_tau, len(x_s) + start_tau):
-            flow_value = 0.0
-            x = x_s[i]
-            for k in range(len(cos_harmonic_values)):
-                flow_value = (flow_value + cos_harmonic_values[k] * math.cos(z * k * (x - x_min))
-                              + sin_harmonic_values[k] * math.sin(z * k * (x - x_min)))
-            temp_dim_parts[n][FLOW][i] = flow_value
-    return temp_dim_parts
\ No newline at end of file
+    :param dim_parts: List of DataFrame splits of the data.
+    :param cos_harmonic_values: The cosine harmonic values for each part.
+    :param sin_harmonic_values: The sine harmonic values for each part.
+    :param out: preallocated output array with the total size of the parts.
+    :param basis_cache: HarmonicBasisCache, the values are the products of the cached basis and the harmonic values.
+    :return: array of the function values of all parts one after another.
+    """
+    if out is None:
+        out = np.empty(sum(len(dim_part) for dim_part in dim_parts))
+    offset = 0
+    for n, dim_part in enumerate(dim_parts):
+        x_s = dim_part[TIME].to_numpy(dtype=float)
+        if basis_cache is not None:
+            cos_basis, sin_basis = basis_cache.get_basis(x_s, len(cos_harmonic_values[n]))
+            out[offset:offset + len(x_s)] = (np.asarray(cos_harmonic_values[n]) @ cos_basis
+                                             + np.asarray(sin_harmonic_values[n]) @ sin_basis)
+        else:
+            x_min = x_s.min()
+            evaluate_fourier_series(x_s, x_min, x_s.max() - x_min, cos_harmonic_values[n], sin_harmonic_values[n],
+                                    out[offset:offset + len(x_s)])
+        offset += len(x_s)
+    return out
+
+
+def calculate_function(dim_parts, cos_harmonic_values, sin_harmonic_values, basis_cache=None):
+    flow_values = reconstruct_fourier_series(dim_parts, cos_harmonic_values, sin_harmonic_values,
+                                             basis_cache=basis_cache)
+    return split_by_parts(dim_parts, flow_values)
+
+
+def calculate_function_by_mean_harmonic_values(dim_parts, cos_harmonic_values, sin_harmonic_values,
+                                               basis_cache=None):
+    flow_values = reconstruct_fourier_series(dim_parts, [cos_harmonic_values] * len(dim_parts),
+                                             [sin_harmonic_values] * len(dim_parts), basis_cache=basis_cache)
+    return split_by_parts(dim_parts, flow_values)
+
+
+def split_by_parts(dim_parts, flow_values):
+    """
+    Creates the parts with FLOW replaced by the slices of the function values.
+
+    :param dim_parts: List of DataFrame splits of the data.
+    :param flow_values: array of the function values of all parts one after another.
+    :return: List of DataFrame splits with the function values.
+    """
+    temp_dim_parts = []
+    offset = 0
+    for dim_part in dim_parts:
+        temp_dim_parts.append(dim_part.assign(**{FLOW: flow_values[offset:offset + len(dim_part)]}))
+        offset += len(dim_part)
+    return temp_dim_parts
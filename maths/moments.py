@@ -0,0 +1,83 @@
+"""
+This module provides the Moments class that accumulates count, mean, M2 (sum of squared deviations),
+min and max of the flow values in one pass. The moments of chunks and worker processes are merged
+by the rule of Chan et al., so the statistics of the flow are calculated once and shared by
+Dimensionless, ApproximateDimension and CorrelationFunction.
+"""
+import numpy as np
+
+
+class Moments:
+    """
+    Single-pass moments of the values, std is the sample std (ddof=1) as pandas calculates.
+    """
+
+    def __init__(self, count=0, mean=0.0, m2=0.0, min_value=np.inf, max_value=-np.inf):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.min = min_value
+        self.max = max_value
+
+    @classmethod
+    def from_values(cls, values):
+        """
+        Creates moments of the values.
+
+        :param values: values of the flow (array or Series).
+        :return: Moments.
+        """
+        return cls().update(values)
+
+    def update(self, values):
+        """
+        Adds the chunk of values to the moments.
+
+        :param values: chunk of the flow values.
+        :return: self.
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        if len(values) == 0:
+            return self
+        chunk_mean = values.mean()
+        deviations = values - chunk_mean
+        return self.merge(Moments(len(values), chunk_mean, float(np.dot(deviations, deviations)),
+                                  values.min(), values.max()))
+
+    def merge(self, other):
+        """
+        Adds the other moments to the moments.
+
+        :param other: Moments.
+        :return: self.
+        """
+        if other.count == 0:
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * other.count / count
+        self.m2 = self.m2 + other.m2 + delta ** 2 * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def scaled(self, factor):
+        """
+        Returns moments of the values multiplied by the factor (as example, the dimensionless flow
+        dim[FLOW] / flow_scale), so the moments are not calculated again.
+
+        :param factor: The factor of the values.
+        :return: Moments.
+        """
+        min_value, max_value = sorted((self.min * factor, self.max * factor)) if self.count > 0 \
+            else (self.min, self.max)
+        return Moments(self.count, self.mean * factor, self.m2 * factor ** 2, min_value, max_value)
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else np.nan
+
+    @property
+    def std(self):
+        return float(np.sqrt(self.variance))
@@ -0,0 +1,198 @@
+"""
+This module provides mergeable sketches of the flow values: a fixed-bin histogram and
+a t-digest-style quantile sketch. The sketches are updated chunk by chunk, can be merged
+across worker processes and are converted into the density and probability frames of
+`calculate_density` and `calculate_probability`.
+"""
+import numpy as np
+
+from maths.stats import calculate_histogram, create_density_and_probability
+
+
+class HistogramSketch:
+    """
+    Fixed-bin histogram of the values, the value belongs to the interval (left edge, right edge].
+    """
+
+    def __init__(self, min_value=None, max_value=None, intervals=None, bin_edges=None):
+        """
+        :param min_value: The left edge of the first interval.
+        :param max_value: The right edge of the last interval.
+        :param intervals: The number of intervals (see NUMBER_DENSITY_INTERVALS).
+        :param bin_edges: The user-provided increasing edges of the intervals (instead of min, max and intervals).
+        """
+        if bin_edges is None:
+            bin_edges = np.linspace(min_value, max_value, intervals + 1)
+        self.bin_edges = np.asarray(bin_edges, dtype=float)
+        self.counts = np.zeros(len(self.bin_edges) - 1, dtype=np.int64)
+        self.count = 0
+        self.underflow = 0
+        self.overflow = 0
+
+    def update(self, values):
+        """
+        Adds the chunk of values to the histogram.
+
+        :param values: chunk of the flow values.
+        :return: self.
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        self.counts += calculate_histogram(values, self.bin_edges)
+        self.count += len(values)
+        self.underflow += int(np.count_nonzero(values <= self.bin_edges[0]))
+        self.overflow += int(np.count_nonzero(values > self.bin_edges[-1]))
+        return self
+
+    def merge(self, other):
+        """
+        Adds the other histogram with the same edges to the histogram.
+
+        :param other: HistogramSketch.
+        :return: self.
+        """
+        if not np.array_equal(self.bin_edges, other.bin_edges):
+            raise ValueError("Histograms with different bin edges can not be merged")
+        self.counts += other.counts
+        self.count += other.count
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        return self
+
+    def get_density(self, y_name="y", x_name="x"):
+        """
+        Returns the probability density as `calculate_density` does.
+
+        :param y_name: The name of the density column.
+        :param x_name: The name of the column with the right edges of the intervals.
+        :return: The width of the intervals and the density DataFrame.
+        """
+        density, _ = create_density_and_probability(self.bin_edges, self.counts, self.count, y_name, x_name)
+        return np.diff(self.bin_edges), density
+
+    def get_probability(self, y_name="y", x_name="x"):
+        """
+        Returns the cumulative probability as `calculate_probability` does.
+
+        :param y_name: The name of the probability column.
+        :param x_name: The name of the column with the right edges of the intervals.
+        :return: The probability DataFrame.
+        """
+        _, probability = create_density_and_probability(self.bin_edges, self.counts, self.count, y_name, x_name)
+        return probability
+
+
+class QuantileSketch:
+    """
+    Quantile sketch in the style of the merging t-digest. The values are kept as centroids (mean, weight),
+    the centroids are merged while they fit one unit of the scale function
+    k(q) = compression / (2 * pi) * arcsin(2q - 1), so the tails keep small centroids and accurate quantiles.
+    """
+
+    def __init__(self, compression=200):
+        """
+        :param compression: The compression of the sketch, the number of centroids is about compression / 2.
+        """
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min_value = np.inf
+        self.max_value = -np.inf
+
+    @property
+    def count(self):
+        return float(self.weights.sum())
+
+    def update(self, values):
+        """
+        Adds the chunk of values to the sketch.
+
+        :param values: chunk of the flow values.
+        :return: self.
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        if len(values) == 0:
+            return self
+        self.min_value = min(self.min_value, values.min())
+        self.max_value = max(self.max_value, values.max())
+        self.__compress(np.concatenate((self.means, values)),
+                        np.concatenate((self.weights, np.ones(len(values)))))
+        return self
+
+    def merge(self, other):
+        """
+        Adds the other sketch to the sketch.
+
+        :param other: QuantileSketch.
+        :return: self.
+        """
+        self.min_value = min(self.min_value, other.min_value)
+        self.max_value = max(self.max_value, other.max_value)
+        self.__compress(np.concatenate((self.means, other.means)),
+                        np.concatenate((self.weights, other.weights)))
+        return self
+
+    def __compress(self, means, weights):
+        """
+        Merges the sorted centroids, the centroid is related to the unit of the scale function
+        where its left cumulative weight is.
+
+        :param means: means of the centroids.
+        :param weights: weights of the centroids.
+        """
+        order = np.argsort(means, kind="stable")
+        means = means[order]
+        weights = weights[order]
+        cumulative = np.cumsum(weights)
+        q_left = (cumulative - weights) / cumulative[-1]
+        scale = self.compression / (2.0 * np.pi) * np.arcsin(2.0 * q_left - 1.0)
+        clusters = np.floor(scale - scale[0]).astype(np.int64)
+        starts = np.flatnonzero(np.concatenate(([True], np.diff(clusters) != 0)))
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def __centres(self):
+        """
+        Returns the cumulative probabilities of the centroid centres with the min and max values at 0 and 1.
+
+        :return: probabilities and values.
+        """
+        cumulative = np.cumsum(self.weights)
+        centres = (cumulative - self.weights / 2.0) / cumulative[-1]
+        return (np.concatenate(([0.0], centres, [1.0])),
+                np.concatenate(([self.min_value], self.means, [self.max_value])))
+
+    def quantile(self, probabilities):
+        """
+        Returns the values for the probabilities (as example, CRITICAL_PROB_VALUE).
+
+        :param probabilities: probability or array of probabilities.
+        :return: value or array of values.
+        """
+        probabilities_grid, values_grid = self.__centres()
+        return np.interp(probabilities, probabilities_grid, values_grid)
+
+    def cdf(self, values):
+        """
+        Returns the cumulative probabilities of the values.
+
+        :param values: value or array of values.
+        :return: probability or array of probabilities.
+        """
+        probabilities_grid, values_grid = self.__centres()
+        return np.interp(values, values_grid, probabilities_grid)
+
+    def get_probability(self, intervals, y_name="y", x_name="x"):
+        """
+        Returns the cumulative probability on the intervals of `calculate_probability`.
+
+        :param intervals: The number of intervals (see NUMBER_DENSITY_INTERVALS).
+        :param y_name: The name of the probability column.
+        :param x_name: The name of the column with the right edges of the intervals.
+        :return: The probability DataFrame.
+        """
+        max_tau = self.max_value * 1.001
+        min_tau = self.min_value * 0.999
+        bin_edges = min_tau + (max_tau - min_tau) / intervals * np.arange(intervals + 1)
+        counts = np.diff(self.cdf(bin_edges)) * self.count
+        _, probability = create_density_and_probability(bin_edges, counts, self.count, y_name, x_name)
+        return probability
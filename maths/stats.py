@@ -1,8 +1,12 @@
 """
-This module provides functions to calculate probability density values
-for normal and uniform distributions. Useful for probabilistic modeling
+This module provides functions to calculate probability density and cumulative
+probability values for normal, uniform and exponential distributions (the functions
+take scalars or arrays), the histogram or kernel density and the
+cumulative probability of sampled values. Useful for probabilistic modeling
 and statistical analysis.
 """
+import math
+
 import numpy as np
 import pandas as pd
 
@@ -27,44 +31,260 @@ def uniform_distribution(value, mean, min_value):
     Calculates the probability density of a uniform distribution centered at `mean`.
 
     Args:
-        value (float): The point at which to evaluate the distribution.
-        mean (float): The center of the uniform distribution.
-        min_value (float): The minimum value used to define the range.
+        value (float or array-like): The point(s) at which to evaluate the distribution.
+        mean (float or array-like): The center of the uniform distribution.
+        min_value (float or array-like): The minimum value used to define the range.
+
+    Returns:
+        float or ndarray: The probability density at the given point(s), or 0.0 if out of range.
+    """
+    delta = np.asarray(mean) - min_value
+    result = np.where((mean - delta <= value) & (value <= mean + delta), 1.0 / (2.0 * delta), 0.0)
+    return result[()]
+
+
+def exponential_distribution(value, mean):
+    """
+    Calculates the probability density of an exponential distribution (as example, of the tau sequence).
+
+    Args:
+        value (float or array-like): The point(s) at which to evaluate the distribution.
+        mean (float or array-like): The mean (1/λ) of the distribution.
+
+    Returns:
+        float or ndarray: The probability density at the given point(s), or 0.0 for negative values.
+    """
+    value = np.asarray(value, dtype=float)
+    result = np.where(value >= 0.0, np.exp(-np.maximum(value, 0.0) / mean) / mean, 0.0)
+    return result[()]
+
+
+def normal_cdf(value, mean, std):
+    """
+    Calculates the cumulative probability of a normal (Gaussian) distribution.
+
+    Args:
+        value (float or array-like): The point(s) at which to evaluate the distribution.
+        mean (float or array-like): The mean (μ) of the distribution.
+        std (float or array-like): The standard deviation (σ) of the distribution.
+
+    Returns:
+        float or ndarray: The cumulative probability at the given point(s).
+    """
+    return 0.5 * (1.0 + erf((np.asarray(value, dtype=float) - mean) / (std * np.sqrt(2.0))))
+
+
+def uniform_cdf(value, mean, min_value):
+    """
+    Calculates the cumulative probability of a uniform distribution centered at `mean`.
+
+    Args:
+        value (float or array-like): The point(s) at which to evaluate the distribution.
+        mean (float or array-like): The center of the uniform distribution.
+        min_value (float or array-like): The minimum value used to define the range.
+
+    Returns:
+        float or ndarray: The cumulative probability at the given point(s).
+    """
+    delta = np.asarray(mean) - min_value
+    return np.clip((np.asarray(value, dtype=float) - min_value) / (2.0 * delta), 0.0, 1.0)[()]
+
+
+def exponential_cdf(value, mean):
+    """
+    Calculates the cumulative probability of an exponential distribution.
+
+    Args:
+        value (float or array-like): The point(s) at which to evaluate the distribution.
+        mean (float or array-like): The mean (1/λ) of the distribution.
+
+    Returns:
+        float or ndarray: The cumulative probability at the given point(s).
+    """
+    return (1.0 - np.exp(-np.maximum(np.asarray(value, dtype=float), 0.0) / mean))[()]
+
+
+def erf(value):
+    """
+    Calculates the error function element-wise by math.erf (exact to double precision, no extra dependency).
+
+    Args:
+        value (float or array-like): The argument(s) of the function.
 
     Returns:
-        float: The probability density at the given point, or 0.0 if out of range.
-    """
-    delta = mean - min_value
-    result = 0.0
-    if mean - delta <= value <= mean + delta:
-        result = 1.0 / (2.0 * delta)
-    return result
-
-
-def calculate_probability(values, intervals, y_name="y", x_name="x"):
-    delta, generated_distribution_density =  calculate_density(values, intervals, y_name, x_name,)
-    probability = initialization_function_y_from_x(intervals, y_name, x_name)
-    summa = 0.0
-    for k in range(intervals):
-        summa += generated_distribution_density[y_name][k] * delta
-        probability[x_name][k] = generated_distribution_density[x_name][k]
-        probability[y_name][k] = summa
+        float or ndarray: The error function at the given argument(s).
+    """
+    return np.vectorize(math.erf, otypes=[float])(np.asarray(value, dtype=float))[()]
+
+
+def calculate_probability(values, intervals, y_name="y", x_name="x", bin_edges=None, density_function=None):
+    """
+    Calculates the cumulative probability of the values by the histogram or by the given density function.
+
+    Args:
+        values (array-like): The values of the flow.
+        intervals (int): The number of intervals (see NUMBER_DENSITY_INTERVALS), not used if bin_edges are given.
+        y_name (str): The name of the probability column.
+        x_name (str): The name of the column with the right edges of the intervals.
+        bin_edges (array-like): The user-provided increasing edges of the intervals.
+        density_function (callable): The function with the signature of `calculate_density`
+            (as example, `calculate_kernel_density`), the probability is the cumulative sum of density * delta,
+            the density at the grid point x is the density of the cell [x - delta / 2, x + delta / 2].
+            It can not be used together with bin_edges.
+
+    Returns:
+        DataFrame: The cumulative probability at the right edges of the intervals (cells).
+
+    Raises:
+        ValueError: If both bin_edges and density_function are given.
+    """
+    if density_function is not None:
+        if bin_edges is not None:
+            raise ValueError("bin_edges can not be used with density_function")
+        delta, generated_distribution_density = density_function(values, intervals, y_name, x_name)
+        probability = pd.DataFrame()
+        probability[x_name] = generated_distribution_density[x_name].to_numpy() + np.asarray(delta) / 2.0
+        probability[y_name] = np.cumsum(generated_distribution_density[y_name].to_numpy() * delta)
+        return probability
+    _, _, probability = calculate_density_and_probability(values, intervals, y_name, x_name, bin_edges)
     return probability
 
 
-def calculate_density(values, intervals, y_name, x_name,):
-    max_tau = values.max() * 1.001
-    min_tau = values.min() * 0.999
-    delta = (max_tau - min_tau) / intervals
-    line = sorted(values)
-    generated_distribution_density = initialization_function_y_from_x(intervals, y_name, x_name)
-    tau = min_tau
-    for k in range(intervals):
-        for i in range(len(line)):
-            if tau < line[i] <= tau + delta:
-                generated_distribution_density[y_name][k] += 1.0 / (delta * len(line))
-        tau = tau + delta
-        generated_distribution_density[x_name][k] = tau
+def calculate_density(values, intervals, y_name, x_name, bin_edges=None):
+    """
+    Calculates the probability density of the values by the histogram.
+
+    Args:
+        values (array-like): The values of the flow.
+        intervals (int): The number of intervals (see NUMBER_DENSITY_INTERVALS), not used if bin_edges are given.
+        y_name (str): The name of the density column.
+        x_name (str): The name of the column with the right edges of the intervals.
+        bin_edges (array-like): The user-provided increasing edges of the intervals.
+
+    Returns:
+        tuple: The width of the intervals (float, or array for bin_edges) and the density DataFrame.
+    """
+    delta, generated_distribution_density, _ = calculate_density_and_probability(values, intervals, y_name, x_name,
+                                                                                 bin_edges)
+    return delta, generated_distribution_density
+
+
+def calculate_density_and_probability(values, intervals, y_name="y", x_name="x", bin_edges=None):
+    """
+    Calculates the probability density and the cumulative probability of the values in one pass.
+    The value belongs to the interval (left edge, right edge], the interval is found by binary search.
+
+    Args:
+        values (array-like): The values of the flow.
+        intervals (int): The number of intervals (see NUMBER_DENSITY_INTERVALS), not used if bin_edges are given.
+        y_name (str): The name of the density and probability columns.
+        x_name (str): The name of the column with the right edges of the intervals.
+        bin_edges (array-like): The user-provided increasing edges of the intervals.
+
+    Returns:
+        tuple: The width of the intervals (float, or array for bin_edges), the density DataFrame
+        and the probability DataFrame.
+    """
+    values = np.asarray(values, dtype=float)
+    if bin_edges is None:
+        max_tau = values.max() * 1.001
+        min_tau = values.min() * 0.999
+        delta = (max_tau - min_tau) / intervals
+        bin_edges = min_tau + delta * np.arange(intervals + 1)
+    else:
+        bin_edges = np.asarray(bin_edges, dtype=float)
+        delta = np.diff(bin_edges)
+    counts = calculate_histogram(values, bin_edges)
+    generated_distribution_density, probability = create_density_and_probability(bin_edges, counts, len(values),
+                                                                                 y_name, x_name)
+    return delta, generated_distribution_density, probability
+
+
+def create_density_and_probability(bin_edges, counts, size, y_name="y", x_name="x"):
+    """
+    Creates the density and the cumulative probability DataFrames from the histogram.
+
+    Args:
+        bin_edges (array-like): The increasing edges of the intervals.
+        counts (array-like): The number of values in each interval.
+        size (int): The number of all values (including the values out of the edges).
+        y_name (str): The name of the density and probability columns.
+        x_name (str): The name of the column with the right edges of the intervals.
+
+    Returns:
+        tuple: The density DataFrame and the probability DataFrame.
+    """
+    bin_edges = np.asarray(bin_edges, dtype=float)
+    generated_distribution_density = pd.DataFrame()
+    generated_distribution_density[x_name] = bin_edges[1:]
+    generated_distribution_density[y_name] = counts / (np.diff(bin_edges) * size)
+    probability = pd.DataFrame()
+    probability[x_name] = bin_edges[1:]
+    probability[y_name] = np.cumsum(counts) / size
+    return generated_distribution_density, probability
+
+
+def calculate_histogram(values, bin_edges):
+    """
+    Counts the values in the intervals (left edge, right edge], the values out of the edges are skipped.
+
+    Args:
+        values (array-like): The values of the flow.
+        bin_edges (array-like): The increasing edges of the intervals.
+
+    Returns:
+        ndarray: The number of values in each interval.
+    """
+    indexes = np.searchsorted(bin_edges, values, side="left") - 1
+    inside = (indexes >= 0) & (indexes < len(bin_edges) - 1)
+    return np.bincount(indexes[inside], minlength=len(bin_edges) - 1)
+
+
+def calculate_kernel_density(values, intervals, y_name, x_name, bandwidth=None):
+    """
+    Calculates the probability density of the values by the Gaussian kernel density estimator.
+    The values are linearly binned onto the grid of `intervals` points and convolved with the kernel by FFT,
+    the complicity is n + intervals * log(intervals). The grid covers [min - 3h, max + 3h].
+
+    Args:
+        values (array-like): The values of the flow.
+        intervals (int): The number of points of the grid (see NUMBER_DENSITY_INTERVALS).
+        y_name (str): The name of the density column.
+        x_name (str): The name of the column with the grid points.
+        bandwidth (float): The bandwidth h of the kernel, by default the Silverman's rule of thumb.
+
+    Returns:
+        tuple: The step of the grid and the density DataFrame.
+
+    Raises:
+        ValueError: If the bandwidth is not positive (as example, the rule of thumb for constant values).
+    """
+    values = np.asarray(values, dtype=float)
+    size = len(values)
+    if bandwidth is None:
+        quartiles = np.percentile(values, [25, 75])
+        spread = min(values.std(ddof=1), (quartiles[1] - quartiles[0]) / 1.34) or values.std(ddof=1)
+        bandwidth = 0.9 * spread * size ** (-0.2)
+    if not bandwidth > 0:
+        raise ValueError(f"The bandwidth of the kernel density must be positive: {bandwidth}")
+    grid = np.linspace(values.min() - 3.0 * bandwidth, values.max() + 3.0 * bandwidth, intervals)
+    delta = grid[1] - grid[0]
+
+    position = (values - grid[0]) / delta
+    left = np.clip(np.floor(position).astype(np.int64), 0, intervals - 2)
+    fraction = position - left
+    weights = (np.bincount(left, weights=1.0 - fraction, minlength=intervals)
+               + np.bincount(left + 1, weights=fraction, minlength=intervals))
+
+    kernel_size = min(intervals - 1, int(np.ceil(4.0 * bandwidth / delta)))
+    offsets = np.arange(-kernel_size, kernel_size + 1) * delta
+    kernel = np.exp(-offsets ** 2 / (2.0 * bandwidth ** 2)) / (bandwidth * np.sqrt(2.0 * np.pi))
+    fft_size = 1 << (intervals + 2 * kernel_size).bit_length()
+    convolution = np.fft.irfft(np.fft.rfft(weights, fft_size) * np.fft.rfft(kernel, fft_size), fft_size)
+
+    generated_distribution_density = pd.DataFrame()
+    generated_distribution_density[x_name] = grid
+    generated_distribution_density[y_name] = np.maximum(convolution[kernel_size:kernel_size + intervals], 0.0) / size
     return delta, generated_distribution_density
 
 
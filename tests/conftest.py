@@ -0,0 +1,18 @@
+"""
+The modules of the package import each other by the plain package names (constants, maths, ...) and
+the approximate model by the name of the installed package (common_utils.approximate_model), so both
+are made importable from the working tree.
+"""
+import sys
+import types
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+try:
+    import common_utils  # noqa: F401
+except ImportError:
+    common_utils = types.ModuleType("common_utils")
+    common_utils.__path__ = [str(ROOT)]
+    sys.modules["common_utils"] = common_utils
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from maths.cdf_index import CdfIndex
+from maths.stats import calculate_density_and_probability
+
+
+@pytest.mark.parametrize("bin_edges", [None, [0.5, 2.0, 3.0, 5.0, 8.0]])
+def test_from_probability_frame_starts_at_left_edge(bin_edges):
+    values = np.random.default_rng(0).uniform(1.0, 7.0, size=1000)
+    delta, _, probability = calculate_density_and_probability(values, 10, bin_edges=bin_edges)
+    edges = np.asarray(bin_edges) if bin_edges is not None else probability["x"][0] - delta + delta * np.arange(11)
+    cdf_index = CdfIndex.from_probability_frame(probability, delta=delta)
+    first_probability = probability["y"][0]
+    assert cdf_index.probability(edges[0]) == 0.0
+    assert cdf_index.probability((edges[0] + edges[1]) / 2.0) == pytest.approx(first_probability / 2.0)
+    assert cdf_index.value(first_probability / 2.0) == pytest.approx((edges[0] + edges[1]) / 2.0)
+    np.testing.assert_allclose(cdf_index.probability(edges[1:]), probability["y"])
+
+
+def test_from_probability_frame_uses_first_interval_width_by_default():
+    _, _, probability = calculate_density_and_probability(np.arange(100.0) + 10.0, 4)
+    delta = probability["x"][1] - probability["x"][0]
+    cdf_index = CdfIndex.from_probability_frame(probability)
+    assert cdf_index.values_grid[0] == pytest.approx(probability["x"][0] - delta)
+    assert cdf_index.probabilities_grid[0] == 0.0
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from constants.flow_constants import FLOW, TIME
+from common_utils.approximate_model.StochasticTelegraphWaveFixedSeparatedIntervalApproximate import \
+    StochasticTelegraphWaveFixedSeparatedIntervalApproximate, StochasticTelegraphWaveFixedSeparatedIntervalStream, \
+    interval_edges, interval_indexes
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_interval_indexes_match_pd_cut(seed):
+    rng = np.random.default_rng(seed)
+    time = np.sort(rng.normal(size=rng.integers(2, 200)) * rng.choice([1e-3, 1.0, 1e5]) + rng.choice([0.0, 1e6]))
+    number_of_interval = int(rng.integers(1, 30))
+    expected = pd.cut(pd.Series(time), bins=number_of_interval, labels=False).to_numpy()
+    indexes = interval_indexes(time, interval_edges(time.min(), time.max(), number_of_interval))
+    np.testing.assert_array_equal(indexes, expected)
+
+
+@pytest.mark.parametrize("value", [0.0, 5.0, -5.0])
+def test_interval_indexes_match_pd_cut_for_constant_time(value):
+    time = np.full(4, value)
+    expected = pd.cut(pd.Series(time), bins=3, labels=False).to_numpy()
+    np.testing.assert_array_equal(interval_indexes(time, interval_edges(value, value, 3)), expected)
+
+
+def test_get_param_with_empty_interval():
+    dim = pd.DataFrame({TIME: [0.0, 1.0, 2.0, 3.0, 4.0, 50.0, 51.0, 52.0],
+                        FLOW: [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0]})
+    approximate_dim, mean, std = StochasticTelegraphWaveFixedSeparatedIntervalApproximate(dim, 5).get_param()
+    expected = np.array([3.0] * 5 + [7.0] * 3)
+    np.testing.assert_allclose(approximate_dim[FLOW].to_numpy(), expected)
+    assert mean == pytest.approx(expected.mean())
+    assert std == pytest.approx(expected.std(ddof=1))
+    assert list(dim.columns) == [TIME, FLOW]
+    np.testing.assert_array_equal(dim[FLOW].to_numpy(), np.arange(1.0, 9.0))
+
+
+def test_stream_matches_get_param():
+    rng = np.random.default_rng(0)
+    dim = pd.DataFrame({TIME: np.arange(5000) * 0.1, FLOW: rng.normal(size=5000)})
+    approximate_dim, mean, std = StochasticTelegraphWaveFixedSeparatedIntervalApproximate(dim, 37).get_param()
+
+    stream = StochasticTelegraphWaveFixedSeparatedIntervalStream(dim[TIME].min(), dim[TIME].max(), 37)
+    chunks = [dim.iloc[chunk] for chunk in np.array_split(np.arange(len(dim)), 9)]
+    for chunk in chunks:
+        stream.update(chunk)
+    streamed = pd.concat([stream.approximate(chunk) for chunk in chunks])
+
+    np.testing.assert_allclose(streamed[FLOW].to_numpy(), approximate_dim[FLOW].to_numpy(), atol=1e-12)
+    assert stream.get_moments().mean == pytest.approx(mean, abs=1e-12)
+    assert stream.get_moments().std == pytest.approx(std, abs=1e-12)
+    np.testing.assert_allclose(stream.get_run_length_flow().to_flow(), approximate_dim[FLOW].to_numpy(), atol=1e-12)
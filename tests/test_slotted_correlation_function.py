@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from constants.flow_constants import FLOW, TIME, PERIOD, CORRELATION, CORRELATION_ENGINE, SLOT_WIDTH
+from corr_func.correlation_function import CorrelationFunction
+from corr_func.slotted_correlation_function import SlottedCorrelationFunction
+
+
+def test_slotted_correlation_matches_correlation_function_on_uniform_grid():
+    rng = np.random.default_rng(0)
+    dim = pd.DataFrame({TIME: 0.5 * np.arange(400), FLOW: rng.normal(size=400).cumsum()})
+    expected = CorrelationFunction(dim, {PERIOD: 3, CORRELATION_ENGINE: "FFT"}).get_correlation()
+    correlation = SlottedCorrelationFunction(dim, {PERIOD: 3}).get_correlation()
+    np.testing.assert_allclose(correlation[TIME], expected[TIME])
+    np.testing.assert_allclose(correlation[CORRELATION], expected[CORRELATION], atol=1e-10)
+
+
+def test_default_slot_width_skips_repeated_timestamps():
+    time = np.repeat(np.arange(50.0) * 2.0, 3)
+    dim = pd.DataFrame({TIME: time, FLOW: np.random.default_rng(1).normal(size=len(time))})
+    slotted = SlottedCorrelationFunction(dim, {PERIOD: 1})
+    assert slotted.slot_width == 2.0
+    assert np.isfinite(slotted.get_correlation()[CORRELATION]).all()
+
+
+@pytest.mark.parametrize("time, slot_width", [([1.0, 1.0, 1.0], None), ([0.0, 1.0, 2.0], 0.0),
+                                              ([0.0, 1.0, 2.0], -1.0)])
+def test_non_positive_slot_width_raises(time, slot_width):
+    dim = pd.DataFrame({TIME: time, FLOW: [1.0, 2.0, 4.0]})
+    with pytest.raises(ValueError):
+        SlottedCorrelationFunction(dim, {PERIOD: 1, SLOT_WIDTH: slot_width})
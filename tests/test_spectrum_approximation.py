@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from constants.flow_constants import FLOW, TIME, APPROXIMATE_TYPE, NUMBER_OF_INTERVALS, NUMBER_OF_HARMONICS, \
+    USE_HARMONIC_BASIS_CACHE, EXECUTOR_TYPE, WORKERS, HARMONIC_ENERGY_TARGET, APPROXIMATE_MEAN, APPROXIMATE_STD
+from common_utils.approximate_model.batch_approximate_dimension import BatchApproximateDimension
+from common_utils.approximate_model.spectrum_approximation import SpectrumWithMoreRealizationApproximate
+
+CONFIG = {NUMBER_OF_INTERVALS: 6, NUMBER_OF_HARMONICS: 5, WORKERS: 2}
+
+
+@pytest.fixture
+def dim():
+    rng = np.random.default_rng(0)
+    time = np.arange(603) * 0.25
+    return pd.DataFrame({TIME: time, FLOW: np.sin(time) + rng.normal(size=len(time)).cumsum() * 0.1})
+
+
+@pytest.mark.parametrize("executor_type", ["SERIAL", "THREAD", "PROCESS"])
+@pytest.mark.parametrize("use_basis_cache", [False, True])
+def test_get_result_matches_batch_approximation(dim, executor_type, use_basis_cache):
+    config = dict(CONFIG, **{EXECUTOR_TYPE: executor_type, USE_HARMONIC_BASIS_CACHE: use_basis_cache})
+    approximate_dim, mean, std = SpectrumWithMoreRealizationApproximate(dim, config).get_param()
+    batch = BatchApproximateDimension([dim], dict(config, **{APPROXIMATE_TYPE: "SPECTRUM_WITH_MORE_REALIZATION"}))
+    assert len(approximate_dim) == len(dim)
+    np.testing.assert_allclose(approximate_dim[FLOW], batch.get_approximate_flows()[0], atol=1e-10)
+    statistics = batch.get_statistics().iloc[0]
+    assert mean == pytest.approx(statistics[APPROXIMATE_MEAN])
+    assert std == pytest.approx(statistics[APPROXIMATE_STD])
+
+
+@pytest.mark.parametrize("executor_type", ["SERIAL", "PROCESS"])
+def test_get_result_with_adaptive_harmonics(dim, executor_type):
+    config = dict(CONFIG, **{EXECUTOR_TYPE: executor_type, HARMONIC_ENERGY_TARGET: 0.9})
+    approximation = SpectrumWithMoreRealizationApproximate(dim, config)
+    assert len(approximation.get_param()[0]) == len(dim)
+    assert len(approximation.get_harmonic_counts()) == CONFIG[NUMBER_OF_INTERVALS]
+    assert all(1 <= count <= CONFIG[NUMBER_OF_HARMONICS] for count in approximation.get_harmonic_counts())
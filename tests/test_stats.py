@@ -0,0 +1,31 @@
+import math
+
+import numpy as np
+import pytest
+
+from maths.stats import calculate_kernel_density, erf, normal_cdf
+
+
+def test_kernel_density_integrates_to_one():
+    values = np.random.default_rng(0).normal(size=2000)
+    delta, density = calculate_kernel_density(values, 512, "y", "x")
+    assert np.isfinite(density["y"]).all()
+    assert density["y"].sum() * delta == pytest.approx(1.0, abs=1e-3)
+
+
+@pytest.mark.parametrize("values, bandwidth", [(np.full(10, 3.0), None), (np.arange(10.0), 0.0)])
+def test_kernel_density_with_zero_bandwidth_raises(values, bandwidth):
+    with pytest.raises(ValueError):
+        calculate_kernel_density(values, 64, "y", "x", bandwidth)
+
+
+def test_erf_matches_math_erf():
+    values = np.linspace(-6.0, 6.0, 241)
+    np.testing.assert_array_equal(erf(values), [math.erf(value) for value in values])
+    assert erf(0.5) == math.erf(0.5)
+
+
+def test_normal_cdf_is_exact():
+    assert normal_cdf(1.0, 0.0, 1.0) == pytest.approx(0.8413447460685429, rel=1e-15)
+    np.testing.assert_allclose(normal_cdf([-1.96, 0.0, 1.96], 0.0, 1.0), [0.0249978951482204, 0.5, 0.9750021048517795],
+                               rtol=1e-13)
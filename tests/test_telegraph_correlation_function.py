@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from constants.flow_constants import FLOW, TIME, PERIOD, CORRELATION, CORRELATION_ENGINE, MAX_LAG
+from common_utils.approximate_model.run_length_flow import RunLengthFlow
+from corr_func.correlation_function import CorrelationFunction
+from corr_func.telegraph_correlation_function import TelegraphCorrelationFunction
+
+
+def create_telegraph_dim(seed, dim_size, mean_run_length):
+    rng = np.random.default_rng(seed)
+    switches = np.flatnonzero(rng.random(dim_size - 1) < 1.0 / mean_run_length) + 1
+    levels = rng.normal(1e3, 5.0, size=len(switches) + 1)
+    flow = np.repeat(levels, np.diff(np.concatenate(([0], switches, [dim_size]))))
+    return pd.DataFrame({TIME: 0.5 * np.arange(dim_size), FLOW: flow})
+
+
+@pytest.mark.parametrize("seed, period, max_lag", [(0, 1, None), (1, 7, None), (2, 3, 40)])
+def test_telegraph_correlation_matches_correlation_function(seed, period, max_lag):
+    dim = create_telegraph_dim(seed, 3000, 4.0)
+    config = {PERIOD: period, CORRELATION_ENGINE: "FFT"}
+    expected = CorrelationFunction(dim, config).get_correlation()
+    run_length_flow = RunLengthFlow.from_flow(dim, dim[FLOW])
+    correlation = TelegraphCorrelationFunction(run_length_flow, dict(config, **{MAX_LAG: max_lag})).get_correlation()
+    size = len(correlation)
+    assert size == (len(expected) if max_lag is None else max_lag)
+    np.testing.assert_allclose(correlation[TIME], expected[TIME][:size])
+    np.testing.assert_allclose(correlation[CORRELATION], expected[CORRELATION][:size], rtol=0, atol=1e-10)